@@ -1,39 +1,69 @@
-from flask import Flask, render_template, request, jsonify, send_file, session, redirect, url_for, flash
+import startup
+import metrics
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash, Response, stream_with_context
 import os
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
-from resume_parser import ResumeParser
-from job_matcher import JobMatcher
-import pandas as pd
+from resume_store import ResumeStore
+from ingest import IngestPool, get_matcher
+from jobs import JobQueue
+from skill_vocabulary import get_taxonomy
+from export import EXPORT_FORMATS, stream_export, export_to_file
+from bulk_ingest import ArchiveError, open_archive, iter_archive, iter_directory, ingest_stream, format_ndjson, format_sse
+import io
+import json
+import click
 from datetime import datetime
-import uuid
+import hashlib
 from functools import wraps
 from dotenv import load_dotenv
-import requests
 
 load_dotenv()
 
 app = Flask(__name__)
-app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024
+# Worker processes for parsing and scoring uploads; 0 or 1 processes inline
+app.config['INGEST_WORKERS'] = int(os.getenv('INGEST_WORKERS', '0'))
+# Background threads feeding asynchronous uploads (/upload?async=1)
+app.config['JOB_THREADS'] = int(os.getenv('JOB_THREADS', '2'))
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key-change-this-in-production')
 app.config['CLERK_PUBLISHABLE_KEY'] = os.getenv('CLERK_PUBLISHABLE_KEY', '')
 app.config['CLERK_SECRET_KEY'] = os.getenv('CLERK_SECRET_KEY', '')
 
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs('data', exist_ok=True)
 
 EXCEL_FILE = 'data/all_resumes.xlsx'
+DB_FILE = os.getenv('RESUME_DB', 'data/resumes.db')
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt'}
 
+store = ResumeStore(DB_FILE)
+ingest_pool = IngestPool(app.config['INGEST_WORKERS'])
+job_queue = JobQueue(ingest_pool, store, threads=app.config['JOB_THREADS'])
+
+# One-time migration of the workbook written by older versions
+if os.path.exists(EXCEL_FILE) and store.count() == 0:
+    try:
+        store.import_excel(EXCEL_FILE)
+        os.replace(EXCEL_FILE, EXCEL_FILE + '.migrated')
+    except Exception as e:
+        print(f"Could not migrate {EXCEL_FILE}: {e}")
+
 # In-memory user storage (replace with database in production)
 users = {
     'admin': {
-        'password': generate_password_hash('admin123'),
+        'password': None,  # Hashed on first login; hashing costs ~100ms of cold start
         'email': 'admin@resumeproject.com',
         'name': 'Administrator'
     }
 }
+DEFAULT_ADMIN_PASSWORD = 'admin123'
+
+
+def password_matches(username, password):
+    user = users[username]
+    if user['password'] is None:
+        user['password'] = generate_password_hash(DEFAULT_ADMIN_PASSWORD)
+    return check_password_hash(user['password'], password)
 
 
 def allowed_file(filename):
@@ -68,7 +98,7 @@ def login():
         username = request.form.get('username')
         password = request.form.get('password')
         
-        if username in users and check_password_hash(users[username]['password'], password):
+        if username in users and password_matches(username, password):
             session['authenticated'] = True
             session['username'] = username
             session['user_name'] = users[username]['name']
@@ -195,68 +225,47 @@ def upload_file():
     if not files or files[0].filename == '':
         return jsonify({'error': 'No files selected'}), 400
 
-    results = []
-    saved_count = 0
-    rejected_count = 0
+    results = [None] * len(files)
+    pending = []
 
-    for file in files:
+    for index, file in enumerate(files):
         if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            unique_filename = f"{uuid.uuid4().hex}_{filename}"
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-            file.save(filepath)
-
-            try:
-                parser = ResumeParser()
-                resume_data = parser.parse_resume(filepath)
-
-                matcher = JobMatcher()
-                match_score, matched_skills, missing_skills = matcher.calculate_match(
-                    resume_data['skills'], job_description
-                )
-
-                excel_data = {
-                    'Name': resume_data['name'],
-                    'Email': resume_data['email'],
-                    'Phone Number': resume_data['phone'],
-                    'ATS Score': f"{match_score}%"
-                }
-
-                save_to_excel(excel_data)
-                saved_count += 1
-                status = "Saved"
-
-                results.append({
-                    'filename': filename,
-                    'name': resume_data['name'],
-                    'email': resume_data['email'],
-                    'match_score': match_score,
-                    'status': status,
-                    'matched_skills': matched_skills,
-                    'missing_skills': missing_skills
-                })
-
-                os.remove(filepath)
-
-            except Exception as e:
-                results.append({
-                    'filename': filename,
-                    'error': f'Error processing: {str(e)}',
-                    'status': 'Error'
-                })
-                rejected_count += 1
-
-                if os.path.exists(filepath):
-                    os.remove(filepath)
+            # Parsed straight from the upload stream, never written to disk
+            pending.append((index, file.read(), secure_filename(file.filename)))
         else:
-            results.append({
+            metrics.inc('files_rejected_total')
+            results[index] = {
                 'filename': file.filename,
                 'error': 'Invalid file type',
                 'status': 'Rejected'
-            })
-            rejected_count += 1
+            }
+
+    if request.values.get('async') in ('1', 'true'):
+        rejected = {index: result for index, result in enumerate(results) if result is not None}
+        job = job_queue.submit([file.filename for file in files], pending, rejected, job_description)
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'status_url': url_for('get_job', job_id=job.id),
+            'stream_url': url_for('stream_job', job_id=job.id)
+        }), 202
+
+    # ?trace=1 returns the time spent in each stage for this request
+    with metrics.trace() as trace:
+        outcomes = ingest_pool.process([(data, name) for _, data, name in pending], job_description)
 
-    return jsonify({
+        rows = []
+        for (index, _, _), (result, row) in zip(pending, outcomes):
+            results[index] = result
+            if row is not None:
+                rows.append(row)
+
+        saved_count = len(rows)
+        rejected_count = len(files) - saved_count
+
+        store.upsert_many(rows)
+
+    response = {
         'success': True,
         'results': results,
         'summary': {
@@ -265,63 +274,163 @@ def upload_file():
             'rejected_count': rejected_count,
             'message': f'Processed {len(files)} resumes: {saved_count} saved, {rejected_count} rejected'
         }
-    })
+    }
+    if request.values.get('trace') in ('1', 'true'):
+        response['trace'] = trace.to_dict()
+    return jsonify(response)
 
 
-def save_to_excel(data):
-    """Save data to Excel with exact column structure"""
+@app.route('/upload/archive', methods=['POST'])
+@require_auth
+def upload_archive():
+    """Ingest a ZIP of resumes, streaming each file's result as it finishes
+
+    Results are NDJSON by default, or server-sent events with ?format=sse
+    or Accept: text/event-stream. The final item is the summary.
+    """
+    archive_file = request.files.get('archive') or request.files.get('file')
+    if archive_file is None or archive_file.filename == '':
+        return jsonify({'error': 'No archive selected'}), 400
+    # The request closes its files before a streamed body is read, so
+    # take over the spooled upload and close it once the stream ends
+    stream, archive_file.stream = archive_file.stream, io.BytesIO()
     try:
-        columns = ['Name', 'Email', 'Phone Number', 'ATS Score']
-
-        if os.path.exists(EXCEL_FILE):
-            try:
-                df_existing = pd.read_excel(EXCEL_FILE)
-
-                if list(df_existing.columns) == columns:
-                    duplicate_mask = df_existing['Email'] == data['Email']
-
-                    if duplicate_mask.any():
-                        df_existing.loc[duplicate_mask, 'ATS Score'] = data['ATS Score']
-                        df_existing.loc[duplicate_mask, 'Name'] = data['Name']
-                        df_existing.loc[duplicate_mask, 'Phone Number'] = data['Phone Number']
-                        print(f"Updated existing resume for {data['Name']}")
-                    else:
-                        df_new = pd.DataFrame([data])
-                        df_existing = pd.concat([df_existing, df_new], ignore_index=True)
-                        print(f"Added new resume for {data['Name']}")
-
-                    df_final = df_existing
-                else:
-                    print("Column mismatch detected, recreating Excel file...")
-                    df_final = pd.DataFrame([data], columns=columns)
-
-            except Exception as e:
-                print(f"Error reading existing file: {e}, creating new one...")
-                df_final = pd.DataFrame([data], columns=columns)
-        else:
-            df_final = pd.DataFrame([data], columns=columns)
-            print(f"Created new Excel file with resume for {data['Name']}")
+        archive = open_archive(stream)
+    except ArchiveError as e:
+        stream.close()
+        return jsonify({'error': str(e)}), 400
+
+    job_description = request.form.get('job_description', '')
+
+    def results():
+        try:
+            yield from ingest_stream(ingest_pool, store, iter_archive(archive, allowed_file), job_description)
+        finally:
+            archive.close()
+            stream.close()
+
+    items = results()
+    if request.args.get('format') == 'sse' or request.accept_mimetypes.best == 'text/event-stream':
+        return Response(stream_with_context(format_sse(items)), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    return Response(stream_with_context(format_ndjson(items)), mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no'})
+
 
-        df_final = df_final[columns]
-        df_final.to_excel(EXCEL_FILE, index=False)
-        print(f"Excel file updated: {EXCEL_FILE}")
+@app.route('/jobs/<job_id>')
+@require_auth
+def get_job(job_id):
+    """Status and partial results of a background upload"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/jobs/<job_id>/stream')
+@require_auth
+def stream_job(job_id):
+    """Stream per-file results of a background upload as server-sent events"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return Response(job.stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/rank', methods=['POST'])
+@require_auth
+def rank_candidates():
+    """Rank stored candidates against one or more job descriptions"""
+    payload = request.get_json(silent=True) or {}
+    job_descriptions = payload.get('job_descriptions') or []
+    if not isinstance(job_descriptions, list) or not job_descriptions:
+        return jsonify({'error': 'Provide a list of job_descriptions'}), 400
 
+    try:
+        top_k = int(payload.get('top_k', 10))
+        candidates = store.candidates()
+        rankings, job_keywords = get_matcher().rank_candidates(
+            [skills for _, skills in candidates], [str(text) for text in job_descriptions], top_k
+        )
+        return jsonify({
+            'success': True,
+            'candidate_count': len(candidates),
+            'rankings': [
+                {
+                    'job_index': job,
+                    'keywords': sorted(job_keywords[job]),
+                    'candidates': [
+                        dict(candidates[index][0], match_score=score) for index, score in ranking
+                    ]
+                }
+                for job, ranking in enumerate(rankings)
+            ]
+        })
     except Exception as e:
-        print(f"Error saving to Excel: {e}")
-        raise e
+        return jsonify({'error': f'Error ranking candidates: {str(e)}'}), 500
+
+
+@app.route('/search')
+@require_auth
+def search_resumes():
+    """Search stored candidates by boolean skill query and/or ranked text query
+
+    ?skills=kubernetes AND (go OR golang) NOT php  &q=distributed systems
+    """
+    skills = request.args.get('skills', '').strip()
+    text = request.args.get('q', '').strip()
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+        aliases = get_taxonomy().aliases
+        resumes = store.search(skills=skills or None, text=text or None, limit=limit,
+                               normalize=lambda term: aliases.get(term, term))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'success': True, 'resumes': resumes, 'count': len(resumes)})
+
+
+def listing_filters():
+    """Sort and filter arguments shared by /get_resumes and /download"""
+    return {
+        'sort': request.args.get('sort', 'added'),
+        'min_score': request.args.get('min_score', type=float),
+        'max_score': request.args.get('max_score', type=float),
+        'prefix': request.args.get('q')
+    }
 
 
 @app.route('/get_resumes')
 @require_auth
 def get_resumes():
-    """Get all resumes data to display in web interface"""
+    """Get one page of resumes to display in web interface
+
+    Query parameters: limit, cursor (from next_cursor), sort (added,
+    recent, score_desc, score_asc), min_score, max_score and q (name or
+    email prefix).
+    """
     try:
-        if os.path.exists(EXCEL_FILE):
-            df = pd.read_excel(EXCEL_FILE)
-            resumes = df.to_dict('records')
-            return jsonify({'success': True, 'resumes': resumes})
+        # The store version changes on every write, so unchanged pages revalidate for free
+        etag = f'{store.version()}-{hashlib.sha1(request.query_string).hexdigest()[:16]}'
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
         else:
-            return jsonify({'success': True, 'resumes': []})
+            resumes, next_cursor = store.page(
+                limit=max(1, min(int(request.args.get('limit', 100)), 1000)),
+                cursor=request.args.get('cursor'),
+                **listing_filters()
+            )
+            response = jsonify({
+                'success': True,
+                'resumes': resumes,
+                'next_cursor': next_cursor,
+                'total': store.count()
+            })
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Error reading resumes: {str(e)}'}), 500
 
@@ -329,10 +438,29 @@ def get_resumes():
 @app.route('/download')
 @require_auth
 def download_excel():
-    """Download the Excel file with essential data"""
-    if os.path.exists(EXCEL_FILE):
-        return send_file(EXCEL_FILE, as_attachment=True, download_name='resume_shortlist.xlsx')
-    return jsonify({'error': 'No resume data found'}), 404
+    """Stream an export of the candidate store
+
+    format is xlsx (default), csv or parquet; the /get_resumes filters
+    and sort apply as well.
+    """
+    file_format = request.args.get('format', 'xlsx')
+    if file_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'Unsupported format: {file_format}'}), 400
+    if store.count() == 0:
+        return jsonify({'error': 'No resume data found'}), 404
+
+    try:
+        filters = listing_filters()
+        store.page(limit=1, **filters)  # Validate filters before streaming starts
+        body = stream_export(store.iter_records(**filters), file_format)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 501
+
+    mimetype, download_name = EXPORT_FORMATS[file_format]
+    return Response(body, mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={download_name}'})
 
 
 @app.route('/stats')
@@ -340,31 +468,18 @@ def download_excel():
 def get_stats():
     """Get statistics about stored resumes"""
     try:
-        if os.path.exists(EXCEL_FILE):
-            df = pd.read_excel(EXCEL_FILE)
-            total_resumes = len(df)
-
-            if 'ATS Score' in df.columns:
-                scores = df['ATS Score'].astype(str).str.replace('%', '').astype(float)
-                avg_score = scores.mean()
-                high_scores = len(scores[scores >= 80])
-            else:
-                avg_score = 0
-                high_scores = 0
-
-            return jsonify({
-                'total_resumes': total_resumes,
-                'average_score': round(avg_score, 1),
-                'high_score_count': high_scores,
-                'excel_file': EXCEL_FILE
-            })
-        else:
-            return jsonify({
-                'total_resumes': 0,
-                'average_score': 0,
-                'high_score_count': 0,
-                'excel_file': EXCEL_FILE
-            })
+        breakdown = request.args.get('breakdown') in ('1', 'true')
+        stats = store.stats(breakdown=breakdown)
+        response = {
+            'total_resumes': stats['total'],
+            'average_score': round(stats['average'], 1),
+            'high_score_count': stats['high_scores'],
+            'excel_file': DB_FILE
+        }
+        if breakdown:
+            response['score_bands'] = stats['bands']
+            response['top_missing_skills'] = stats['top_missing_skills']
+        return jsonify(response)
     except Exception as e:
         return jsonify({'error': f'Error reading stats: {str(e)}'}), 500
 
@@ -373,12 +488,52 @@ def get_stats():
 @require_auth
 def clear_resumes():
     try:
-        if os.path.exists(EXCEL_FILE):
-            os.remove(EXCEL_FILE)
+        store.clear()
         return jsonify({'success': True, 'message': 'All resume data cleared'})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/debug/startup')
+@require_auth
+def startup_report():
+    """Cold-start timings: app import time and lazily imported modules"""
+    return jsonify(startup.report())
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape target; exposes only counters and stage timings"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.cli.command('ingest')
+@click.argument('directory', type=click.Path(exists=True, file_okay=False))
+@click.option('--job-description', default='', help='Job description to score against')
+@click.option('--recursive/--no-recursive', default=True)
+def ingest_command(directory, job_description, recursive):
+    """Parse, score and store every resume in a directory, printing NDJSON results"""
+    entries = iter_directory(directory, allowed_file, recursive=recursive)
+    for item in ingest_stream(ingest_pool, store, entries, job_description):
+        print(json.dumps(item), flush=True)
+
+
+@app.cli.command('export')
+@click.argument('path', required=False)
+@click.option('--format', 'file_format', type=click.Choice(sorted(EXPORT_FORMATS)), default='xlsx')
+def export_command(path, file_format):
+    """Write the candidate store to a file, replacing it atomically
+
+    Defaults to data/resume_export.<format>; never EXCEL_FILE, which a
+    restart with an empty store would import back.
+    """
+    path = path or f'data/resume_export.{file_format}'
+    export_to_file(store.iter_records(), path, file_format)
+    print(f"Exported {store.count()} resumes to {path}")
+
+
+startup.mark_ready()
+
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,250 @@
+"""Benchmark the parse -> match -> store pipeline on synthetic resumes
+
+Generates reproducible PDF, DOCX and TXT corpora at several sizes and
+prints one JSON report with p50/p99 latency, resumes per second and peak
+RSS per stage, so numbers can be compared between commits:
+
+    python benchmark.py --sizes 50,200 > bench_output.txt
+"""
+import argparse
+import io
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+FIRST_NAMES = ['Aisha', 'Carlos', 'Mei', 'John', 'Priya', 'Olga', 'Kwame', 'Sofia', 'Rohan', 'Liam']
+LAST_NAMES = ['Khan', 'Garcia', 'Chen', 'Smith', 'Patel', 'Ivanova', 'Mensah', 'Rossi', 'Gupta', 'Walsh']
+SKILLS = ['Python', 'Java', 'JavaScript', 'Go', 'Rust', 'React', 'Angular', 'Django', 'Flask', 'Node.js',
+          'PostgreSQL', 'MongoDB', 'Redis', 'AWS', 'Azure', 'Docker', 'Kubernetes', 'Git', 'Jira', 'Agile',
+          'Scrum', 'REST', 'GraphQL', 'Machine Learning', 'Pandas', 'TensorFlow', 'CI/CD', 'Microservices']
+FILLER = ('Delivered features end to end, reviewed code, mentored engineers and worked with product '
+          'owners to plan releases across several teams.')
+
+JOB_DESCRIPTIONS = [
+    'Backend engineer with Python, Django, PostgreSQL and Docker. 3+ years experience. '
+    'Nice to have: Kubernetes, Redis.',
+    'Frontend developer: React, TypeScript, CSS, REST APIs, Git. Bachelor degree preferred.',
+    'Data engineer working with Python, Pandas, AWS, Machine Learning and CI/CD. 5+ years experience.',
+]
+
+
+def resume_text(rng, index, paragraphs=3):
+    """Plain text of one synthetic resume"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    email = f"{name.lower().replace(' ', '.')}{index}@example.com"
+    phone = f"+1 {rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}"
+    lines = [name, email, phone, '', 'Skills', ', '.join(rng.sample(SKILLS, rng.randint(4, 12))), '',
+             'Experience']
+    lines += [FILLER] * paragraphs
+    lines += ['', 'Education', 'Bachelor of Science in Computer Science']
+    return '\n'.join(lines) + '\n'
+
+
+def _pdf_escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(text):
+    """Minimal single-page PDF with one text line per source line"""
+    commands = ['BT', '/F1 10 Tf', '12 TL', '50 780 Td']
+    for line in text.split('\n'):
+        commands.append(f"({_pdf_escape(line)}) Tj T*")
+    commands.append('ET')
+    stream = '\n'.join(commands).encode('latin-1', 'replace')
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+        b'/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+        b'<< /Length ' + str(len(stream)).encode() + b' >>\nstream\n' + stream + b'\nendstream',
+    ]
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n".encode() + body + b'\nendobj\n')
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def make_docx(text):
+    """DOCX with one paragraph per source line"""
+    import docx
+
+    document = docx.Document()
+    for line in text.split('\n'):
+        document.add_paragraph(line)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def make_corpus(file_format, size, seed):
+    """Return [(data, filename)] for size synthetic resumes"""
+    rng = random.Random(f"{seed}:{file_format}:{size}")
+    corpus = []
+    for index in range(size):
+        text = resume_text(rng, index, paragraphs=rng.randint(1, 8))
+        if file_format == 'pdf':
+            data = make_pdf(text)
+        elif file_format == 'docx':
+            data = make_docx(text)
+        else:
+            data = text.encode('utf-8')
+        corpus.append((data, f"resume_{index}.{file_format}"))
+    return corpus
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def timed(items, fn):
+    """Run fn over items, returning per-item latencies and total wall time"""
+    latencies = []
+    start = time.perf_counter()
+    for item in items:
+        item_start = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - item_start)
+    return latencies, time.perf_counter() - start
+
+
+def summarize(latencies, elapsed, resumes):
+    return {
+        'resumes': resumes,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'resumes_per_second': round(resumes / elapsed, 1) if elapsed else None,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def bench_parse(parser, corpus):
+    latencies, elapsed = timed(corpus, lambda item: parser.parse_resume(item[0]))
+    return summarize(latencies, elapsed, len(corpus))
+
+
+def bench_match(matcher, skills):
+    pairs = [(resume_skills, jd) for resume_skills in skills for jd in JOB_DESCRIPTIONS]
+    latencies, elapsed = timed(pairs, lambda pair: matcher.calculate_match(*pair))
+    # Each resume is scored against every job description
+    report = summarize(latencies, elapsed, len(pairs))
+    report['job_descriptions'] = len(JOB_DESCRIPTIONS)
+    return report
+
+
+def bench_store(store_class, db_path, rows, batch_size):
+    store = store_class(db_path)
+    batches = [rows[start:start + batch_size] for start in range(0, len(rows), batch_size)]
+    latencies, elapsed = timed(batches, store.upsert_many)
+    report = summarize(latencies, elapsed, len(rows))
+    report['batch_size'] = batch_size
+    return report
+
+
+def bench_upload(client, corpus, batch_size):
+    batches = [corpus[start:start + batch_size] for start in range(0, len(corpus), batch_size)]
+
+    def upload(batch):
+        files = [(io.BytesIO(data), filename) for data, filename in batch]
+        response = client.post('/upload', data={'file': files, 'job_description': JOB_DESCRIPTIONS[0]},
+                               content_type='multipart/form-data')
+        if response.status_code != 200:
+            raise RuntimeError(f"/upload returned {response.status_code}")
+
+    latencies, elapsed = timed(batches, upload)
+    report = summarize(latencies, elapsed, len(corpus))
+    report['batch_size'] = batch_size
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', default='20,100', help='comma-separated corpus sizes')
+    parser.add_argument('--formats', default='txt,pdf,docx', help='comma-separated formats')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--batch-size', type=int, default=10, help='files per upload / store batch')
+    parser.add_argument('--output', help='also write the JSON report to this file')
+    args = parser.parse_args(argv)
+
+    # Point the app at throwaway databases before it is imported
+    workdir = tempfile.mkdtemp(prefix='resume-bench-')
+    os.environ['RESUME_DB'] = os.path.join(workdir, 'app.db')
+    os.environ['PARSE_CACHE_DB'] = os.path.join(workdir, 'parse_cache.db')
+
+    import app as app_module
+    from job_matcher import JobMatcher
+    from resume_parser import ResumeParser
+    from resume_store import ResumeStore
+
+    client = app_module.app.test_client()
+    with client.session_transaction() as session:
+        session['authenticated'] = True
+
+    resume_parser = ResumeParser()
+    matcher = JobMatcher()
+    report = {
+        'python': sys.version.split()[0],
+        'pdf_backend': resume_parser.pdf_backend,
+        'seed': args.seed,
+        'runs': []
+    }
+
+    for file_format in args.formats.split(','):
+        for size in (int(size) for size in args.sizes.split(',')):
+            corpus = make_corpus(file_format, size, args.seed)
+            parsed = [resume_parser.parse_resume(data) for data, _ in corpus]
+            rows = [
+                {
+                    'Name': fields['name'],
+                    'Email': fields['email'],
+                    'Phone Number': fields['phone'],
+                    'ATS Score': '50%',
+                    'Skills': fields['skills'],
+                    'Missing Skills': []
+                }
+                for fields in parsed
+            ]
+            store_db = os.path.join(workdir, f"store_{file_format}_{size}.db")
+            report['runs'].append({
+                'format': file_format,
+                'size': size,
+                'corpus_bytes': sum(len(data) for data, _ in corpus),
+                'parse': bench_parse(resume_parser, corpus),
+                'match': bench_match(matcher, [fields['skills'] for fields in parsed]),
+                'store_upsert': bench_store(ResumeStore, store_db, rows, args.batch_size),
+                'upload': bench_upload(client, corpus, args.batch_size)
+            })
+            client.post('/clear')
+
+    report['peak_rss_mb'] = peak_rss_mb()
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+import json
+import os
+import zipfile
+from werkzeug.utils import secure_filename
+import metrics
+
+# Zip bomb guards: archives are read entry by entry, and every entry is
+# checked against its declared sizes and capped while reading
+MAX_ARCHIVE_ENTRIES = int(os.getenv('MAX_ARCHIVE_ENTRIES', '5000'))
+MAX_ENTRY_BYTES = int(os.getenv('MAX_ENTRY_BYTES', str(20 * 1024 * 1024)))
+MAX_ARCHIVE_BYTES = int(os.getenv('MAX_ARCHIVE_BYTES', str(1024 * 1024 * 1024)))
+MAX_COMPRESSION_RATIO = int(os.getenv('MAX_COMPRESSION_RATIO', '100'))
+
+# Rows are written to the store in batches of this many as results arrive
+UPSERT_BATCH_SIZE = 50
+
+
+class ArchiveError(Exception):
+    """The archive as a whole is unreadable or over its limits"""
+
+
+def open_archive(stream):
+    """Open an uploaded ZIP from a seekable binary stream"""
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile as e:
+        raise ArchiveError(f'Not a valid ZIP archive: {e}')
+    if len(archive.infolist()) > MAX_ARCHIVE_ENTRIES:
+        raise ArchiveError(f'Archive has more than {MAX_ARCHIVE_ENTRIES} entries')
+    return archive
+
+
+def iter_archive(archive, allowed):
+    """Yield (data, filename, error) for each file in an open ZipFile
+
+    Entries are decompressed one at a time into memory and never written
+    to disk. error is None for entries to process, or why one was skipped.
+    """
+    total = 0
+    for info in archive.infolist():
+        name = info.filename.rsplit('/', 1)[-1]
+        # Folders and macOS resource forks are not resumes
+        if info.is_dir() or not name or name.startswith('.') or info.filename.startswith('__MACOSX/'):
+            continue
+        filename = secure_filename(name) or 'unnamed'
+
+        if not allowed(name):
+            yield None, filename, 'Invalid file type'
+            continue
+        if info.flag_bits & 0x1:
+            yield None, filename, 'Encrypted entries are not supported'
+            continue
+        if info.file_size > MAX_ENTRY_BYTES:
+            yield None, filename, f'File is larger than {MAX_ENTRY_BYTES} bytes'
+            continue
+        if info.file_size > MAX_COMPRESSION_RATIO * max(info.compress_size, 1):
+            yield None, filename, 'Compression ratio is suspiciously high'
+            continue
+        total += info.file_size
+        if total > MAX_ARCHIVE_BYTES:
+            raise ArchiveError(f'Archive expands to more than {MAX_ARCHIVE_BYTES} bytes')
+
+        try:
+            with archive.open(info) as entry:
+                # Headers can lie about sizes, so never read past the cap
+                data = entry.read(MAX_ENTRY_BYTES + 1)
+        except (zipfile.BadZipFile, OSError, RuntimeError) as e:
+            yield None, filename, f'Unreadable archive entry: {e}'
+            continue
+        if len(data) > MAX_ENTRY_BYTES:
+            yield None, filename, f'File is larger than {MAX_ENTRY_BYTES} bytes'
+            continue
+        yield data, filename, None
+
+
+def iter_directory(path, allowed, recursive=True):
+    """Yield (data, filename, error) for resume files under a directory, read lazily"""
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.')) if recursive else []
+        for name in sorted(files):
+            if name.startswith('.'):
+                continue
+            if not allowed(name):
+                yield None, name, 'Invalid file type'
+                continue
+            file_path = os.path.join(root, name)
+            if os.path.getsize(file_path) > MAX_ENTRY_BYTES:
+                yield None, name, f'File is larger than {MAX_ENTRY_BYTES} bytes'
+                continue
+            with open(file_path, 'rb') as f:
+                yield f.read(), name, None
+
+
+def rejected_result(filename, error):
+    return {
+        'filename': filename,
+        'error': error,
+        'status': 'Rejected'
+    }
+
+
+def ingest_stream(ingest_pool, store, entries, job_description):
+    """Run (data, filename, error) entries through the pool, yielding results as they finish
+
+    Rejected entries are reported without being parsed. Saved rows are
+    upserted in batches, and the last item yielded is the summary dict
+    under the key 'summary'.
+    """
+    rejected = []
+    counts = {'total_files': 0, 'saved_count': 0, 'rejected_count': 0}
+
+    def accepted():
+        try:
+            for data, filename, error in entries:
+                counts['total_files'] += 1
+                if error is not None:
+                    metrics.inc('files_rejected_total')
+                    rejected.append(rejected_result(filename, error))
+                    continue
+                yield data, filename
+        except ArchiveError as e:
+            # Stop reading; files already in flight still finish
+            counts['error'] = str(e)
+
+    rows = []
+    for result, row in ingest_pool.process_iter(accepted(), job_description):
+        while rejected:
+            counts['rejected_count'] += 1
+            yield rejected.pop(0)
+        if row is None:
+            counts['rejected_count'] += 1
+        else:
+            counts['saved_count'] += 1
+            rows.append(row)
+            if len(rows) >= UPSERT_BATCH_SIZE:
+                store.upsert_many(rows)
+                rows = []
+        yield result
+
+    for result in rejected:
+        counts['rejected_count'] += 1
+        yield result
+    store.upsert_many(rows)
+
+    counts['message'] = (f"Processed {counts['total_files']} resumes: {counts['saved_count']} saved, "
+                         f"{counts['rejected_count']} rejected")
+    yield {'summary': counts}
+
+
+def format_ndjson(items):
+    for item in items:
+        yield json.dumps(item) + '\n'
+
+
+def format_sse(items):
+    """Same event names as a background job's stream: result, then done"""
+    for item in items:
+        if 'summary' in item:
+            yield f"event: done\ndata: {json.dumps(item['summary'])}\n\n"
+        else:
+            yield f"event: result\ndata: {json.dumps(item)}\n\n"
@@ -0,0 +1,123 @@
+import csv
+import io
+import os
+import tempfile
+from resume_store import COLUMNS, parse_score
+
+CHUNK_SIZE = 64 * 1024
+
+EXPORT_FORMATS = {
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'resume_shortlist.xlsx'),
+    'csv': ('text/csv', 'resume_shortlist.csv'),
+    'parquet': ('application/vnd.apache.parquet', 'resume_shortlist.parquet'),
+}
+
+
+def stream_csv(records):
+    """Yield CSV text a batch of rows at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for count, record in enumerate(records, 1):
+        writer.writerow([record[column] for column in COLUMNS])
+        if count % 1000 == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _stream_file(f):
+    f.seek(0)
+    try:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        f.close()
+
+
+def stream_xlsx(records):
+    """Yield an .xlsx built with openpyxl's write-only mode
+
+    Rows go straight to openpyxl's on-disk sheet buffer and the finished
+    workbook is read back from a temporary file in chunks.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(COLUMNS)
+    for record in records:
+        sheet.append([record[column] for column in COLUMNS])
+
+    f = tempfile.TemporaryFile()
+    workbook.save(f)
+    return _stream_file(f)
+
+
+def stream_parquet(records, batch_size=10000):
+    """Yield a Parquet file written in row groups of batch_size records"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError('Parquet export requires pyarrow')
+
+    schema = pa.schema([
+        ('Name', pa.string()),
+        ('Email', pa.string()),
+        ('Phone Number', pa.string()),
+        ('ATS Score', pa.float64()),
+    ])
+    f = tempfile.TemporaryFile()
+    with pq.ParquetWriter(f, schema) as writer:
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) == batch_size:
+                writer.write_table(_parquet_table(pa, schema, batch))
+                batch = []
+        if batch:
+            writer.write_table(_parquet_table(pa, schema, batch))
+    return _stream_file(f)
+
+
+def _parquet_table(pa, schema, batch):
+    return pa.table({
+        'Name': [record['Name'] for record in batch],
+        'Email': [record['Email'] for record in batch],
+        'Phone Number': [record['Phone Number'] for record in batch],
+        'ATS Score': [parse_score(record['ATS Score']) for record in batch],
+    }, schema=schema)
+
+
+def stream_export(records, file_format):
+    """Return an iterator over the exported bytes or text"""
+    if file_format == 'csv':
+        return stream_csv(records)
+    if file_format == 'parquet':
+        return stream_parquet(records)
+    return stream_xlsx(records)
+
+
+def export_to_file(records, path, file_format):
+    """Write an export next to path and atomically rename it into place
+
+    Readers of path only ever see the previous complete file or the new
+    one, never a partially written workbook.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in stream_export(records, file_format):
+                f.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
@@ -0,0 +1,335 @@
+import os
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from concurrent.futures.process import BrokenProcessPool
+import metrics
+import sandbox
+from resume_parser import ResumeParser, PARSER_VERSION, detect_format
+from job_matcher import JobMatcher
+from parse_cache import ParseCache, content_hash
+from minhash import signature
+from skill_vocabulary import get_taxonomy
+
+PARSE_CACHE_DB = os.getenv('PARSE_CACHE_DB', 'data/parse_cache.db')
+PARSE_CACHE_SIZE = int(os.getenv('PARSE_CACHE_SIZE', '5000'))
+PDF_EARLY_EXIT = os.getenv('PDF_EARLY_EXIT', '0') == '1'
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', '0')) or None
+# Per-file budgets: characters of text kept, and wall-clock seconds and
+# memory for extracting it in a sandbox worker process (0 disables)
+PARSE_MAX_CHARS = int(os.getenv('PARSE_MAX_CHARS', '200000')) or None
+PARSE_TIMEOUT = float(os.getenv('PARSE_TIMEOUT', '30'))
+PARSE_MEMORY_LIMIT = int(os.getenv('PARSE_MEMORY_LIMIT_MB', '512')) * 1024 * 1024
+
+# Result status and metrics counter for each sandbox.BudgetExceeded reason
+BUDGET_STATUSES = {'timeout': 'Timed Out', 'memory': 'Out of Memory'}
+BUDGET_COUNTERS = {'timeout': 'files_timed_out_total', 'memory': 'files_over_memory_total'}
+
+# Warm per-process instances, built once by the pool initializer
+_parser = None
+_matcher = None
+_cache = None
+
+
+def _new_parser():
+    return ResumeParser(early_exit=PDF_EARLY_EXIT, max_pages=PDF_MAX_PAGES, max_chars=PARSE_MAX_CHARS)
+
+
+def _init_worker():
+    global _parser, _matcher, _cache
+    _parser = _new_parser()
+    _matcher = JobMatcher()
+    _cache = ParseCache(PARSE_CACHE_DB, PARSE_CACHE_SIZE) if PARSE_CACHE_SIZE > 0 else None
+
+
+def get_matcher():
+    """Process-wide warm JobMatcher"""
+    if _matcher is None:
+        _init_worker()
+    return _matcher
+
+
+def _parse_version():
+    """Cache version for parsed fields
+
+    Covers the parser code, the skill taxonomy file and whether NER
+    produced the names, so any of them changing re-derives the fields.
+    """
+    version = f'{PARSER_VERSION}:skills={get_taxonomy().version}'
+    if _parser.ner_model:
+        version += f':ner={_parser.ner_model}'
+    return version
+
+
+def _extract_with_info(data):
+    """Runs in a sandbox worker, which only needs a parser of its own"""
+    global _parser
+    if _parser is None:
+        _parser = _new_parser()
+    text = _parser.extract_text(data)
+    return text, _parser.last_extraction
+
+
+def _extract_text(data):
+    """Extract text within the time and memory budgets
+
+    PDFs and DOCX files are extracted in a long-lived sandbox worker that
+    is killed and replaced when it overruns; plain text is cheap and read
+    inline.
+    """
+    if PARSE_TIMEOUT <= 0 or not sandbox.available() or detect_format(data) == 'txt':
+        return _parser.extract_text(data)
+    text, _parser.last_extraction = sandbox.run(
+        _extract_with_info, (data,), timeout=PARSE_TIMEOUT, memory_bytes=PARSE_MEMORY_LIMIT
+    )
+    return text
+
+
+def _load_text(data):
+    """Return (cache key, text, parsed fields or None) for uploaded bytes
+
+    Cached text is reused for known content; the parsed fields are only
+    returned when they came from the current parser version.
+    """
+    _parser.last_extraction = None
+    if _cache is None:
+        return None, _extract_text(data), None
+
+    key = content_hash(data)
+    if _parser.early_exit or _parser.max_pages or _parser.max_chars:
+        # Partial extractions are cached apart from full ones
+        key += f':{_parser.early_exit}:{_parser.max_pages}:{_parser.max_chars}'
+
+    cached = _cache.get(key)
+    if cached is not None:
+        version, text, parsed, _parser.last_extraction = cached
+        return key, text, parsed if version == _parse_version() else None
+    return key, _extract_text(data), None
+
+
+def _parse_pending(pending):
+    """Parse (key, text, extraction) triples in one batch, falling back to one at a time"""
+    texts = [text for _, text, _ in pending]
+    try:
+        parsed = _parser.parse_texts(texts)
+    except Exception:
+        parsed = []
+        for text in texts:
+            try:
+                parsed.append(_parser.parse_text(text))
+            except Exception as e:
+                parsed.append(e)
+
+    for (key, text, extraction), fields in zip(pending, parsed):
+        if key is not None and not isinstance(fields, Exception):
+            _cache.put(key, _parse_version(), text, fields, extraction)
+    return parsed
+
+
+def _score(filename, resume_data, text, extraction, job_profile):
+    match_score, matched_skills, missing_skills, breakdown = _matcher.match_details(
+        resume_data['skills'], job_profile
+    )
+
+    row = {
+        'Name': resume_data['name'],
+        'Email': resume_data['email'],
+        'Phone Number': resume_data['phone'],
+        'ATS Score': f"{match_score}%",
+        'Skills': resume_data['skills'],
+        'Missing Skills': missing_skills,
+        # Kept for the store's full-text search and near-duplicate lookup
+        'Text': text,
+        'Signature': signature(text)
+    }
+    result = {
+        'filename': filename,
+        'name': resume_data['name'],
+        'email': resume_data['email'],
+        'match_score': match_score,
+        'status': 'Saved',
+        'matched_skills': matched_skills,
+        'missing_skills': missing_skills,
+        'score_breakdown': breakdown
+    }
+    if extraction:
+        result['extraction'] = extraction
+        if extraction.get('truncated'):
+            # Scored on the text read before the page or character budget ran out
+            result['truncated'] = extraction['truncated']
+    return result, row
+
+
+def process_batch(items, job_description):
+    """Parse and score (data, filename) pairs, returning (result, row) for each
+
+    row is the store record for a successfully processed file, or None
+    when the file errored. Texts that need parsing go through
+    ResumeParser.parse_texts together, so NER runs as one nlp.pipe batch,
+    and the job description is compiled into a JobProfile once per batch.
+    """
+    if _parser is None:
+        _init_worker()
+    job_profile = _matcher.profile(job_description)
+
+    outcomes = [None] * len(items)
+    parsed = [None] * len(items)
+    texts = [None] * len(items)
+    extractions = [None] * len(items)
+    pending = []
+
+    for index, (data, filename) in enumerate(items):
+        metrics.inc('bytes_read_total', len(data))
+        try:
+            key, texts[index], parsed[index] = _load_text(data)
+            extractions[index] = _parser.last_extraction
+            if parsed[index] is None:
+                pending.append((index, key, texts[index]))
+        except sandbox.BudgetExceeded as e:
+            metrics.inc(BUDGET_COUNTERS[e.reason])
+            outcomes[index] = (error_result(filename, e), None)
+        except Exception as e:
+            outcomes[index] = (error_result(filename, e), None)
+
+    if pending:
+        fields = _parse_pending([(key, text, extractions[index]) for index, key, text in pending])
+        for (index, _, _), resume_data in zip(pending, fields):
+            parsed[index] = resume_data
+
+    for index, (_, filename) in enumerate(items):
+        if outcomes[index] is not None:
+            continue
+        try:
+            if isinstance(parsed[index], Exception):
+                raise parsed[index]
+            outcomes[index] = _score(filename, parsed[index], texts[index], extractions[index], job_profile)
+        except Exception as e:
+            outcomes[index] = (error_result(filename, e), None)
+
+    errored = sum(1 for _, row in outcomes if row is None)
+    metrics.inc('files_processed_total', len(outcomes) - errored)
+    metrics.inc('files_errored_total', errored)
+    return outcomes
+
+
+def _measured(fn, *args):
+    """Run fn in a worker and return its value with the stage samples it recorded"""
+    return fn(*args), metrics.REGISTRY.drain()
+
+
+def error_result(filename, error):
+    if isinstance(error, sandbox.BudgetExceeded):
+        return {
+            'filename': filename,
+            'error': str(error),
+            'status': BUDGET_STATUSES[error.reason],
+            'budget': error.reason
+        }
+    return {
+        'filename': filename,
+        'error': f'Error processing: {str(error)}',
+        'status': 'Error'
+    }
+
+
+def _mp_context():
+    """forkserver where available, else spawn, but never plain fork
+
+    The pool is started from a threaded server, and a forked worker
+    could inherit a lock another thread held at that moment. The fork
+    server imports this module once, so its workers still start warm.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['ingest'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+class IngestPool:
+    """Runs process_batch inline or across a pool of warm worker processes"""
+
+    def __init__(self, workers=0):
+        self.workers = workers
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=_mp_context(),
+                initializer=_init_worker
+            )
+        return self._executor
+
+    def process(self, items, job_description):
+        """Process (data, filename) pairs, preserving input order"""
+        if self.workers <= 1 or len(items) <= 1:
+            return process_batch(items, job_description)
+
+        # Small chunks keep workers balanced while still batching NER
+        size = max(1, min(16, len(items) // (self.workers * 4)))
+        chunks = [items[start:start + size] for start in range(0, len(items), size)]
+        futures = [self.executor.submit(_measured, process_batch, chunk, job_description)
+                   for chunk in chunks]
+        outcomes = []
+        for future, chunk in zip(futures, chunks):
+            try:
+                chunk_outcomes, samples = future.result()
+                metrics.merge(samples)
+                outcomes.extend(chunk_outcomes)
+            except Exception as e:
+                # A crashed worker only fails its own chunk
+                if isinstance(e, BrokenProcessPool):
+                    self._executor = None
+                metrics.inc('files_errored_total', len(chunk))
+                outcomes.extend((error_result(name, e), None) for _, name in chunk)
+        return outcomes
+
+    def process_iter(self, items, job_description, chunk_size=4):
+        """Yield (result, row) for an iterable of (data, filename) as files finish
+
+        items is consumed lazily and only a few chunks per worker are in
+        flight, so memory stays bounded however many files there are.
+        Results come back in completion order, not input order.
+        """
+        items = iter(items)
+        if self.workers <= 1:
+            while True:
+                chunk = list(islice(items, chunk_size))
+                if not chunk:
+                    return
+                yield from process_batch(chunk, job_description)
+
+        in_flight = {}
+        max_in_flight = self.workers * 2
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < max_in_flight:
+                chunk = list(islice(items, chunk_size))
+                if not chunk:
+                    exhausted = True
+                    break
+                future = self.executor.submit(_measured, process_batch, chunk, job_description)
+                in_flight[future] = chunk
+            if not in_flight:
+                return
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                chunk = in_flight.pop(future)
+                try:
+                    chunk_outcomes, samples = future.result()
+                    metrics.merge(samples)
+                except Exception as e:
+                    if isinstance(e, BrokenProcessPool):
+                        self._executor = None
+                    metrics.inc('files_errored_total', len(chunk))
+                    chunk_outcomes = [(error_result(name, e), None) for _, name in chunk]
+                yield from chunk_outcomes
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -1,87 +1,332 @@
+import hashlib
 import re
-from collections import Counter
+import threading
+from collections import Counter, OrderedDict
+import metrics
+from skill_vocabulary import get_taxonomy
+
+# Skills mentioned in "nice to have" sentences count this much of their weight
+OPTIONAL_WEIGHT = 0.5
+
+OPTIONAL_PATTERN = re.compile(
+    r'\b(?:nice[\s-]to[\s-]have|preferred|bonus|a plus|optional|desirable)\b'
+)
+# A clause with one of these ends the reach of an optional marker
+REQUIRED_PATTERN = re.compile(r'\b(?:must|required|requires?|essential|mandatory|needs?|needed)\b')
+# Sentences end at ';', a newline, or a '.' not followed by more text, so
+# 'Node.js' and 'ASP.NET' stay whole
+SENTENCE_PATTERN = re.compile(r'(?:[^.;\n]|\.(?=\S))+')
+CLAUSE_PATTERN = re.compile(r',|\bbut\b|\bwhile\b|\bwhereas\b')
+EXPERIENCE_PATTERN = re.compile(r'(\d+)\+?\s*years?\s*experience')
+
+# Compiled profiles kept per matcher, keyed by description hash
+PROFILE_CACHE_SIZE = 256
+
+class SkillIndex:
+    """Normalized lookup structure over one resume's skills
+
+    Matches a job keyword when it equals a resume skill, is contained in
+    one ("python" in "python developer") or contains one. Built once
+    per resume so each keyword lookup is a handful of set probes instead
+    of a scan over every resume skill.
+
+    Given a SkillVocabulary, keywords that are vocabulary terms only
+    match the terms found in the resume skills, so 'go' matches 'Go' or
+    'golang' but not 'MongoDB'.
+    """
+
+    # Skills longer than this are scanned instead of indexed by substring
+    MAX_INDEXED_LENGTH = 64
+
+    def __init__(self, resume_skills, aliases=None, vocabulary=None):
+        self.aliases = aliases or {}
+        self.vocabulary = vocabulary
+        self.terms = set()
+        self.exact = set()
+        self.partials = set()
+        self.lengths = set()
+        self.long = []
+        for skill in resume_skills:
+            skill = skill.lower().strip()
+            self._add(skill)
+            if skill in self.aliases:
+                self._add(self.aliases[skill])
+            if vocabulary is not None:
+                self.terms.update(term.lower() for term in vocabulary.find(skill))
+
+    def _add(self, skill):
+        self.exact.add(skill)
+        self.lengths.add(len(skill))
+        if len(skill) > self.MAX_INDEXED_LENGTH:
+            self.long.append(skill)
+            return
+        for start in range(len(skill)):
+            for end in range(start + 1, len(skill) + 1):
+                self.partials.add(skill[start:end])
+
+    def matches(self, job_skill):
+        job_skill = job_skill.lower().strip()
+        if self.vocabulary is not None:
+            term = self.vocabulary.lookup(job_skill)
+            if term is not None:
+                return term in self.terms
+        candidates = {job_skill, self.aliases.get(job_skill, job_skill)}
+        return any(self._matches(candidate) for candidate in candidates)
+
+    def _matches(self, job_skill):
+        # Exact match, or job skill inside a resume skill (a blank one is in any)
+        if job_skill in self.exact or job_skill in self.partials or (not job_skill and self.exact):
+            return True
+
+        # Resume skill inside the job skill
+        for length in self.lengths:
+            for start in range(len(job_skill) - length + 1):
+                if job_skill[start:start + length] in self.exact:
+                    return True
+
+        return any(job_skill in skill for skill in self.long)
+
+
+class JobProfile:
+    """A job description compiled once into weighted requirements
+
+    Holds every keyword the description asks for with its weight and
+    category, split into required and optional ("nice to have") skills,
+    plus the experience threshold and education keywords. match() then
+    scores a resume against it without touching the description again.
+    """
+
+    def __init__(self, job_text, taxonomy):
+        self.weights = {}
+        self.categories = {}
+        self.required = []
+        self.optional = []
+
+        # Dicts rather than sets keep keywords in description order
+        required = {}
+        optional = {}
+        for sentence in SENTENCE_PATTERN.findall(job_text):
+            for clause, is_optional in self._clauses(sentence):
+                found = dict.fromkeys(skill.lower() for skill in taxonomy.vocabulary.find(clause))
+                (optional if is_optional else required).update(found)
+
+        for skill in {**required, **optional}:
+            self.categories[skill] = taxonomy.category_of.get(skill, 'other')
+            weight = taxonomy.weight(skill)
+            if skill not in required:
+                weight *= OPTIONAL_WEIGHT
+                self.optional.append(skill)
+            else:
+                self.required.append(skill)
+            self.weights[skill] = weight
+
+        self.education = [skill for skill in self.weights if self.categories[skill] == 'education']
+
+        # Experience requirement, kept as a keyword like the other requirements
+        self.experience_years = None
+        experience_matches = EXPERIENCE_PATTERN.findall(job_text)
+        if experience_matches:
+            self.experience_years = int(experience_matches[0])
+            keyword = f"{experience_matches[0]}+ years experience"
+            self.weights[keyword] = 1.0
+            self.categories[keyword] = 'experience'
+            self.required.append(keyword)
+
+        self.total_weight = sum(self.weights.values())
+
+    @staticmethod
+    def _clauses(sentence):
+        """Split a sentence into (clause, optional) pairs
+
+        A marker followed by a colon ("Nice to have: Docker, Redis") covers
+        the clauses after it; otherwise ("Docker and Redis preferred") it
+        covers the clauses before it. Either way it stops at a clause that
+        says the skill is required ("Kubernetes is a must, Docker a plus").
+        """
+        clauses = CLAUSE_PATTERN.split(sentence)
+        flags = [False] * len(clauses)
+        for index, clause in enumerate(clauses):
+            marker = OPTIONAL_PATTERN.search(clause)
+            if marker is None:
+                continue
+            step = 1 if clause[marker.end():].lstrip().startswith(':') else -1
+            position = index
+            while 0 <= position < len(clauses):
+                if position != index and REQUIRED_PATTERN.search(clauses[position]):
+                    break
+                flags[position] = True
+                position += step
+        return zip(clauses, flags)
+
+    @property
+    def keywords(self):
+        return list(self.weights)
+
+    def match(self, resume_index):
+        """Return (score, matched, missing, breakdown) for a SkillIndex
+
+        score is the matched share of the total keyword weight; breakdown
+        gives the same per category.
+        """
+        matched = []
+        missing = []
+        matched_weight = 0.0
+        breakdown = {}
+        for keyword, weight in self.weights.items():
+            category = breakdown.setdefault(self.categories[keyword], {
+                'matched': 0, 'total': 0, 'matched_weight': 0.0, 'total_weight': 0.0
+            })
+            category['total'] += 1
+            category['total_weight'] += weight
+            if resume_index.matches(keyword):
+                matched.append(keyword)
+                matched_weight += weight
+                category['matched'] += 1
+                category['matched_weight'] += weight
+            else:
+                missing.append(keyword)
+
+        for category in breakdown.values():
+            category['score'] = round(category['matched_weight'] / category['total_weight'] * 100, 1)
+            category['matched_weight'] = round(category['matched_weight'], 3)
+            category['total_weight'] = round(category['total_weight'], 3)
+
+        if not self.total_weight:
+            return 100, matched, missing, breakdown
+        return round(matched_weight / self.total_weight * 100, 1), matched, missing, breakdown
+
 
 class JobMatcher:
-    def __init__(self):
-        # Common technical skills and tools
-        self.technical_skills = {
-            'programming': ['python', 'java', 'javascript', 'c++', 'c#', 'php', 'ruby', 'go', 'rust', 'swift', 'kotlin'],
-            'frontend': ['html', 'css', 'javascript', 'react', 'angular', 'vue', 'jquery', 'bootstrap', 'sass', 'typescript'],
-            'backend': ['node.js', 'django', 'flask', 'express', 'spring', 'asp.net', 'laravel', 'rails'],
-            'database': ['mysql', 'postgresql', 'mongodb', 'sqlite', 'oracle', 'sql server', 'redis'],
-            'cloud': ['aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git', 'github'],
-            'frameworks': ['react', 'angular', 'vue', 'django', 'flask', 'express', 'spring', 'laravel'],
-            'tools': ['git', 'docker', 'kubernetes', 'jenkins', 'jira', 'confluence', 'postman']
-        }
+    def __init__(self, taxonomy_path=None):
+        # Skill categories, aliases and weights live in data/skills.json
+        self.taxonomy_path = taxonomy_path
         
         # Experience keywords
         self.experience_keywords = ['years', 'experience', 'senior', 'junior', 'lead', 'manager']
         
-        # Education keywords
-        self.education_keywords = ['bachelor', 'master', 'phd', 'degree', 'university', 'college']
+        self._profiles = OrderedDict()
+        # Request threads share the matcher, so the LRU order needs a lock
+        self._profiles_lock = threading.Lock()
+    
+    @property
+    def taxonomy(self):
+        """Shared taxonomy, reloaded when its file changes"""
+        return get_taxonomy(self.taxonomy_path)
+    
+    @property
+    def vocabulary(self):
+        """Compiled matcher over every keyword a job description can require"""
+        return self.taxonomy.vocabulary
+    
+    def index_resume_skills(self, resume_skills):
+        """Build the SkillIndex for a resume's comma-separated skills"""
+        taxonomy = self.taxonomy
+        return SkillIndex(self.extract_resume_skills(resume_skills.lower()), taxonomy.aliases,
+                          taxonomy.vocabulary)
+    
+    def profile(self, job_description):
+        """Return the compiled JobProfile for a description, cached by its hash"""
+        taxonomy = self.taxonomy
+        key = (hashlib.sha256(job_description.encode('utf-8')).hexdigest(), taxonomy.version)
+        with self._profiles_lock:
+            profile = self._profiles.get(key)
+            if profile is not None:
+                self._profiles.move_to_end(key)
+                return profile
+        
+        # Compiled outside the lock; two threads racing on a new description
+        # just build it twice
+        profile = JobProfile(job_description.lower(), taxonomy)
+        with self._profiles_lock:
+            self._profiles[key] = profile
+            if len(self._profiles) > PROFILE_CACHE_SIZE:
+                self._profiles.popitem(last=False)
+        return profile
+    
+    # calculate_match delegates here, so both are timed as one stage
+    @metrics.timed('calculate_match')
+    def match_details(self, resume_skills, job_description):
+        """Weighted match as (score, matched, missing, per-category breakdown)
+
+        job_description may also be a JobProfile compiled by profile().
+        """
+        if isinstance(job_description, JobProfile):
+            job_profile = job_description
+        elif not job_description.strip():
+            return 100, [], [], {}  # No job description = 100% match
+        else:
+            job_profile = self.profile(job_description)
+        return job_profile.match(self.index_resume_skills(resume_skills))
     
     def calculate_match(self, resume_skills, job_description):
-        """Calculate match percentage between resume and job description"""
-        if not job_description.strip():
-            return 100, [], []  # No job description = 100% match
+        """Calculate weighted match percentage between resume and job description"""
+        return self.match_details(resume_skills, job_description)[:3]
+    
+    @metrics.timed('score_matrix')
+    def score_matrix(self, resume_skills_list, job_descriptions):
+        """Score every resume against every job description at once
+
+        Resumes are encoded as 0/1 vectors and jobs as keyword weights over
+        the union of the jobs' keywords, so the whole matrix is one matrix
+        product. Returns
+        (scores, job_keywords) where scores has shape (resumes, jobs) and
+        holds the same percentages calculate_match would.
+        """
+        import numpy as np
         
-        # Extract keywords from job description
-        job_keywords = self.extract_job_keywords(job_description.lower())
+        profiles = [
+            self.profile(description) if description.strip() else None
+            for description in job_descriptions
+        ]
+        job_keywords = [profile.keywords if profile else [] for profile in profiles]
+        universe = sorted({keyword for keywords in job_keywords for keyword in keywords})
+        column = {keyword: index for index, keyword in enumerate(universe)}
         
-        # Extract skills from resume
-        resume_skill_list = self.extract_resume_skills(resume_skills.lower())
+        jobs = np.zeros((len(job_descriptions), len(universe)), dtype=np.float64)
+        for row, profile in enumerate(profiles):
+            if profile:
+                for keyword, weight in profile.weights.items():
+                    jobs[row, column[keyword]] = weight
         
-        # Calculate matches
-        matched_skills = []
-        missing_skills = []
+        # Candidates share skill strings, so each distinct one is encoded once
+        distinct = {}
+        resume_rows = np.empty(len(resume_skills_list), dtype=np.intp)
+        for index, skills in enumerate(resume_skills_list):
+            resume_rows[index] = distinct.setdefault((skills or '').lower(), len(distinct))
+        encoded = np.zeros((len(distinct), len(universe)), dtype=np.float64)
+        for skills, row in distinct.items():
+            resume_index = self.index_resume_skills(skills)
+            encoded[row] = [resume_index.matches(keyword) for keyword in universe]
         
-        for keyword in job_keywords:
-            if self.skill_matches(keyword, resume_skill_list):
-                matched_skills.append(keyword)
-            else:
-                missing_skills.append(keyword)
+        totals = jobs.sum(axis=1, dtype=np.float64)
+        matched = encoded[resume_rows] @ jobs.T
+        scores = np.where(totals > 0, matched / np.maximum(totals, 1) * 100, 100)
+        return np.round(scores, 1), job_keywords
+    
+    def rank_candidates(self, resume_skills_list, job_descriptions, top_k=10):
+        """Return the top_k (resume index, score) pairs for each job description"""
+        import numpy as np
         
-        # Calculate score
-        if not job_keywords:
-            score = 100
-        else:
-            score = (len(matched_skills) / len(job_keywords)) * 100
+        scores, job_keywords = self.score_matrix(resume_skills_list, job_descriptions)
+        k = min(top_k, scores.shape[0])
+        if k <= 0:
+            return [[] for _ in job_descriptions], job_keywords
         
-        return round(score, 1), matched_skills, missing_skills
+        top = np.argpartition(-scores, k - 1, axis=0)[:k]
+        top_scores = np.take_along_axis(scores, top, axis=0)
+        order = np.lexsort((top, -top_scores), axis=0)
+        top = np.take_along_axis(top, order, axis=0)
+        top_scores = np.take_along_axis(top_scores, order, axis=0)
+        
+        rankings = [
+            [(int(index), float(score)) for index, score in zip(top[:, job], top_scores[:, job])]
+            for job in range(scores.shape[1])
+        ]
+        return rankings, job_keywords
     
     def extract_job_keywords(self, job_text):
         """Extract relevant keywords from job description"""
-        keywords = set()
-        
-        # Extract technical skills
-        for category, skills in self.technical_skills.items():
-            for skill in skills:
-                if skill in job_text:
-                    keywords.add(skill)
-        
-        # Extract experience requirements
-        experience_pattern = r'(\d+)\+?\s*years?\s*experience'
-        experience_matches = re.findall(experience_pattern, job_text)
-        if experience_matches:
-            keywords.add(f"{experience_matches[0]}+ years experience")
-        
-        # Extract education requirements
-        for edu_keyword in self.education_keywords:
-            if edu_keyword in job_text:
-                keywords.add(edu_keyword)
-        
-        # Extract other common requirements
-        common_requirements = [
-            'agile', 'scrum', 'kanban', 'ci/cd', 'devops', 'microservices',
-            'api', 'rest', 'graphql', 'testing', 'unit test', 'integration test',
-            'machine learning', 'ai', 'data science', 'analytics', 'sql', 'nosql'
-        ]
-        
-        for req in common_requirements:
-            if req in job_text:
-                keywords.add(req)
-        
-        return list(keywords)
+        return self.profile(job_text).keywords
     
     def extract_resume_skills(self, skills_text):
         """Extract skills from resume skills text"""
@@ -92,31 +337,17 @@ class JobMatcher:
         
         for part in skill_parts:
             part = part.strip()
-            if part and len(part) > 2:  # Filter out very short strings
+            if part:  # Two-letter skills like Go, AI and C# are real skills
                 skills.add(part)
         
         return list(skills)
     
     def skill_matches(self, job_skill, resume_skills):
         """Check if a job skill matches any resume skill"""
-        job_skill = job_skill.lower().strip()
-        
-        for resume_skill in resume_skills:
-            resume_skill = resume_skill.lower().strip()
-            
-            # Exact match
-            if job_skill == resume_skill:
-                return True
-            
-            # Partial match (e.g., "python" matches "python developer")
-            if job_skill in resume_skill or resume_skill in job_skill:
-                return True
-            
-            # Abbreviation match (e.g., "js" matches "javascript")
-            if self.is_abbreviation(job_skill, resume_skill):
-                return True
-        
-        return False
+        if not isinstance(resume_skills, SkillIndex):
+            taxonomy = self.taxonomy
+            resume_skills = SkillIndex(resume_skills, taxonomy.aliases, taxonomy.vocabulary)
+        return resume_skills.matches(job_skill)
     
     def is_abbreviation(self, short, long):
         """Check if short is an abbreviation of long"""
@@ -0,0 +1,189 @@
+import json
+import queue
+import threading
+import time
+import uuid
+import metrics
+from ingest import BUDGET_STATUSES, error_result
+
+
+class Job:
+    """Progress and per-file results of one background upload"""
+
+    def __init__(self, filenames, job_description):
+        self.id = uuid.uuid4().hex
+        self.job_description = job_description
+        self.created_at = time.time()
+        self.status = 'queued'
+        self.error = None
+        self.results = [{'filename': name, 'status': 'Pending'} for name in filenames]
+        self.rows = []
+        self.remaining = 0
+        self.finished_order = []
+        self.condition = threading.Condition()
+
+    def finish_file(self, index, result, row):
+        """Record one finished file; returns True when it was the last one"""
+        with self.condition:
+            self.results[index] = result
+            self.finished_order.append(index)
+            if row is not None:
+                self.rows.append(row)
+            self.remaining -= 1
+            if self.status == 'queued':
+                self.status = 'running'
+            self.condition.notify_all()
+            return self.remaining == 0
+
+    @property
+    def done(self):
+        return self.status in ('done', 'error')
+
+    def fail(self, error):
+        """Mark the job failed after its files were processed but not saved"""
+        with self.condition:
+            self.error = error
+            for result in self.results:
+                if result['status'] == 'Saved':
+                    result['status'] = 'Error'
+                    result['error'] = error
+            self.status = 'error'
+            self.condition.notify_all()
+
+    def summary(self):
+        total = len(self.results)
+        saved = sum(1 for result in self.results if result['status'] == 'Saved')
+        rejected = sum(1 for result in self.results
+                       if result['status'] in ('Rejected', 'Error', *BUDGET_STATUSES.values()))
+        summary = {
+            'total_files': total,
+            'saved_count': saved,
+            'rejected_count': rejected,
+            'message': f'Processed {total} resumes: {saved} saved, {rejected} rejected'
+        }
+        if self.error:
+            summary['error'] = self.error
+        return summary
+
+    def to_dict(self):
+        with self.condition:
+            status = {
+                'success': True,
+                'job_id': self.id,
+                'status': self.status,
+                'progress': {
+                    'completed': len(self.results) - self.remaining,
+                    'total': len(self.results)
+                },
+                'results': list(self.results),
+                'summary': self.summary()
+            }
+            if self.error:
+                status['error'] = self.error
+            return status
+
+    def stream(self, timeout=30):
+        """Yield server-sent events for results as they finish, then the summary"""
+        sent = 0
+        while True:
+            with self.condition:
+                if sent == len(self.finished_order) and not self.done:
+                    self.condition.wait(timeout)
+                indexes = self.finished_order[sent:]
+                sent += len(indexes)
+                results = [self.results[index] for index in indexes]
+                done = self.done and sent == len(self.finished_order)
+            if not results and not done:
+                yield ': keep-alive\n\n'
+            for result in results:
+                yield f"event: result\ndata: {json.dumps(result)}\n\n"
+            if done:
+                yield f"event: done\ndata: {json.dumps(self.summary())}\n\n"
+                return
+
+
+class JobQueue:
+    """Local queue of uploads processed by background worker threads
+
+    Each job's files go through the ingest pool as one batch, so NER runs
+    as one nlp.pipe call and the pool's worker processes share the work.
+    Jobs live in this process only: with several server processes, or
+    on serverless hosts that stop threads after a response, clients
+    should use the synchronous /upload.
+    """
+
+    def __init__(self, ingest_pool, store, threads=2, ttl=3600):
+        self.ingest_pool = ingest_pool
+        self.store = store
+        self.ttl = ttl
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._threads = []
+        self._size = max(1, threads)
+
+    def _start(self):
+        if self._threads:
+            return
+        for _ in range(self._size):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, filenames, items, rejected, job_description):
+        """Queue uploaded files and return the new Job
+
+        items are (index, data, filename) for files to process and
+        rejected maps index -> result for files refused up front.
+        """
+        job = Job(filenames, job_description)
+        for index, result in rejected.items():
+            job.results[index] = result
+            job.finished_order.append(index)
+        job.remaining = len(items)
+
+        with self._lock:
+            self._prune()
+            self.jobs[job.id] = job
+            self._start()
+
+        if items:
+            self._queue.put((job, items))
+        else:
+            self._complete(job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def _work(self):
+        while True:
+            job, items = self._queue.get()
+            try:
+                outcomes = self.ingest_pool.process([(data, filename) for _, data, filename in items],
+                                                    job.job_description)
+            except Exception as e:
+                metrics.inc('files_errored_total', len(items))
+                outcomes = [(error_result(filename, e), None) for _, _, filename in items]
+
+            for (index, _, _), (result, row) in zip(items, outcomes):
+                if job.finish_file(index, result, row):
+                    self._complete(job)
+            self._queue.task_done()
+
+    def _complete(self, job):
+        try:
+            self.store.upsert_many(job.rows)
+        except Exception as e:
+            print(f"Error saving job {job.id}: {e}")
+            job.fail(f'Error saving results: {e}')
+            return
+        with job.condition:
+            job.status = 'done'
+            job.condition.notify_all()
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.done and job.created_at < cutoff]:
+            del self.jobs[job_id]
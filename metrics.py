@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+# With METRICS_ENABLED=0 the timed decorator returns functions unwrapped,
+# so disabled instrumentation costs nothing on the hot path
+ENABLED = os.getenv('METRICS_ENABLED', '1') != '0'
+
+PREFIX = 'resume_'
+
+# Upper bounds in seconds of the stage latency histogram buckets
+BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+COUNTERS = {
+    'files_processed_total': 'Files parsed and scored',
+    'files_rejected_total': 'Uploaded files rejected for their file type',
+    'files_errored_total': 'Files that failed to parse or score',
+    'files_timed_out_total': 'Files whose extraction ran past the time budget',
+    'files_over_memory_total': 'Files whose extraction ran past the memory budget',
+    'bytes_read_total': 'Bytes of uploaded files read',
+}
+
+
+class Registry:
+    """Counters and per-stage latency histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.timers = {}
+
+    def inc(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            timer = self.timers.get(stage)
+            if timer is None:
+                timer = self.timers[stage] = [0, 0.0, [0] * (len(BUCKETS) + 1)]
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2][bisect_left(BUCKETS, seconds)] += 1
+
+    def snapshot(self):
+        """Plain-data copy, picklable so workers can return it"""
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'timers': {stage: [count, total, list(buckets)]
+                           for stage, (count, total, buckets) in self.timers.items()}
+            }
+
+    def drain(self):
+        """Return a snapshot and reset, so the next drain only holds new samples"""
+        with self._lock:
+            snapshot = {'counters': self.counters, 'timers': self.timers}
+            self.counters = {}
+            self.timers = {}
+            return snapshot
+
+    def merge(self, snapshot):
+        with self._lock:
+            for name, amount in snapshot['counters'].items():
+                self.counters[name] = self.counters.get(name, 0) + amount
+            for stage, (count, total, buckets) in snapshot['timers'].items():
+                timer = self.timers.get(stage)
+                if timer is None:
+                    timer = self.timers[stage] = [0, 0.0, [0] * (len(BUCKETS) + 1)]
+                timer[0] += count
+                timer[1] += total
+                timer[2] = [mine + theirs for mine, theirs in zip(timer[2], buckets)]
+
+    def to_dict(self):
+        """Stage counts and seconds plus counters, for a per-request trace"""
+        snapshot = self.snapshot()
+        return {
+            'stages': {
+                stage: {'count': count, 'seconds': round(total, 6)}
+                for stage, (count, total, _) in sorted(snapshot['timers'].items())
+            },
+            'counters': snapshot['counters']
+        }
+
+
+REGISTRY = Registry()
+_local = threading.local()
+
+
+def inc(name, amount=1):
+    """Add to a counter, and to the current thread's trace if one is open"""
+    if not ENABLED:
+        return
+    REGISTRY.inc(name, amount)
+    trace = getattr(_local, 'trace', None)
+    if trace is not None:
+        trace.inc(name, amount)
+
+
+def observe(stage, seconds):
+    REGISTRY.observe(stage, seconds)
+    trace = getattr(_local, 'trace', None)
+    if trace is not None:
+        trace.observe(stage, seconds)
+
+
+def timed(stage):
+    """Decorator recording each call's duration under stage"""
+    def decorator(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def merge(snapshot):
+    """Fold samples returned by a worker process into this process"""
+    if not ENABLED or snapshot is None:
+        return
+    REGISTRY.merge(snapshot)
+    trace = getattr(_local, 'trace', None)
+    if trace is not None:
+        trace.merge(snapshot)
+
+
+@contextmanager
+def trace():
+    """Collect the stages run by this thread into a separate Registry"""
+    previous = getattr(_local, 'trace', None)
+    _local.trace = Registry()
+    try:
+        yield _local.trace
+    finally:
+        _local.trace = previous
+
+
+def render():
+    """Prometheus text exposition of every counter and stage histogram"""
+    snapshot = REGISTRY.snapshot()
+    lines = []
+    for name, help_text in COUNTERS.items():
+        lines.append(f"# HELP {PREFIX}{name} {help_text}")
+        lines.append(f"# TYPE {PREFIX}{name} counter")
+        lines.append(f"{PREFIX}{name} {snapshot['counters'].get(name, 0)}")
+
+    name = f"{PREFIX}stage_seconds"
+    lines.append(f"# HELP {name} Time spent in each pipeline stage; stages nest")
+    lines.append(f"# TYPE {name} histogram")
+    for stage, (count, total, buckets) in sorted(snapshot['timers'].items()):
+        cumulative = 0
+        for bound, bucket in zip(BUCKETS + ('+Inf',), buckets):
+            cumulative += bucket
+            lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_sum{{stage="{stage}"}} {total}')
+        lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,66 @@
+import hashlib
+import re
+import zlib
+from array import array
+from startup import lazy_import
+
+# 16 bands of 4 rows: resumes sharing ~50% of their shingles usually
+# collide in some band, and at 80% they almost always do
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+SEED = 20240501
+
+WORD_PATTERN = re.compile(r'\w+')
+
+_permutations = None
+
+
+def _coefficients():
+    """Fixed random (a, b) pairs, identical in every process"""
+    global _permutations
+    if _permutations is None:
+        np = lazy_import('numpy')
+        rng = np.random.default_rng(SEED)
+        a = rng.integers(1, 2 ** 63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+        b = rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+        _permutations = (a, b)
+    return _permutations
+
+
+def signature(text):
+    """MinHash signature of a text's word shingles as bytes, or None if too short
+
+    Shingles are hashed with crc32 rather than hash() so signatures agree
+    across processes, then permuted with multiply-shift hashing.
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        return None
+    shingles = {' '.join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+    np = lazy_import('numpy')
+    hashes = np.fromiter((zlib.crc32(shingle.encode()) for shingle in shingles),
+                         dtype=np.uint64, count=len(shingles))
+    a, b = _coefficients()
+    # uint64 arithmetic wraps, which is the multiply-shift scheme
+    permuted = (hashes[:, None] * a + b) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32).tobytes()
+
+
+def band_hashes(sig):
+    """(band, hash) pairs used as LSH buckets for a signature"""
+    width = ROWS * 4
+    return [
+        (band, int.from_bytes(hashlib.blake2b(sig[band * width:(band + 1) * width], digest_size=8).digest(),
+                              'big', signed=True))
+        for band in range(BANDS)
+    ]
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity: the share of equal signature slots"""
+    a = array('I', sig_a)
+    b = array('I', sig_b)
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ParseCache:
+    """Persistent LRU cache of extracted resume text and parsed fields
+
+    Entries are keyed by the SHA-256 of the uploaded bytes. The parser
+    version is stored alongside so a parser upgrade re-derives the fields
+    from the cached text instead of trusting stale results, and the
+    extraction record (backend, pages, truncation) so a hit reports the
+    same as the extraction it replaces.
+    """
+
+    def __init__(self, db_path, max_entries=5000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        with conn:
+            # Taken up front so concurrent workers add the column only once
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS parse_cache (
+                    hash TEXT PRIMARY KEY,
+                    version TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    last_used REAL NOT NULL,
+                    extraction TEXT
+                )
+            ''')
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(parse_cache)')}
+            if 'extraction' not in columns:
+                # Caches written before extraction records were stored
+                conn.execute('ALTER TABLE parse_cache ADD COLUMN extraction TEXT')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_parse_cache_last_used ON parse_cache(last_used)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        """Return (version, text, data, extraction) for a content hash, or None"""
+        conn = self._connect()
+        row = conn.execute(
+            'SELECT version, text, data, extraction FROM parse_cache WHERE hash = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute('UPDATE parse_cache SET last_used = ? WHERE hash = ?', (time.time(), key))
+        return row[0], row[1], json.loads(row[2]), json.loads(row[3]) if row[3] else None
+
+    def put(self, key, version, text, data, extraction=None):
+        conn = self._connect()
+        with conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO parse_cache (hash, version, text, data, last_used, extraction)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (key, version, text, json.dumps(data), time.time(),
+                  json.dumps(extraction) if extraction else None))
+            self._evict(conn)
+
+    def _evict(self, conn):
+        overflow = conn.execute('SELECT COUNT(*) FROM parse_cache').fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute('''
+                DELETE FROM parse_cache WHERE hash IN (
+                    SELECT hash FROM parse_cache ORDER BY last_used LIMIT ?
+                )
+            ''', (overflow,))
+
+    def clear(self):
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM parse_cache')
@@ -1,94 +1,370 @@
-import PyPDF2
-from docx import Document
+import importlib.util
+import io
+import os
 import re
-import spacy
+import time
+import zipfile
+import metrics
+from skill_vocabulary import get_taxonomy
+from startup import lazy_import
+
+# Bump when parse_text output changes so cached parses are re-derived
+PARSER_VERSION = '6'
+
+# PDF engines in order of preference; the first one installed is used.
+# pdfminer gives good layout text but is slower than PyPDF2, so it is
+# only picked when asked for via PDF_BACKEND.
+PDF_BACKENDS = ('pypdfium2', 'pypdf2', 'pdfminer')
+
+
+# A DOCX is a ZIP; refuse ones whose parts expand beyond this before
+# python-docx loads the XML into memory
+DOCX_MAX_EXPANDED_BYTES = 100 * 1024 * 1024
+
+
+def available_pdf_backend(preferred=None):
+    """Return the preferred PDF backend if installed, else the fastest available"""
+    candidates = (preferred.lower(),) + PDF_BACKENDS if preferred else PDF_BACKENDS
+    for backend in candidates:
+        if backend == 'pypdf2' or importlib.util.find_spec(backend) is not None:
+            return backend
+    return 'pypdf2'
+
+
+def read_source(source):
+    """Return the bytes of a path, bytes object or binary file-like object"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, 'read'):
+        return source.read()
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def detect_format(data):
+    """Detect pdf, docx or txt from the leading magic bytes"""
+    if data[:5] == b'%PDF-':
+        return 'pdf'
+    if data[:4] == b'PK\x03\x04':
+        return 'docx'
+    try:
+        data[:4096].decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A multi-byte character may straddle the cut
+        if e.start < 4092:
+            raise ValueError("Unsupported file format")
+    return 'txt'
+
+
+def iter_pdf_pages(data, backend='pypdf2'):
+    """Yield the text of each page of an in-memory PDF lazily"""
+    if backend == 'pypdfium2':
+        pdf = lazy_import('pypdfium2').PdfDocument(data)
+        try:
+            for page in pdf:
+                textpage = page.get_textpage()
+                yield textpage.get_text_range()
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+    elif backend == 'pdfminer':
+        extract_pages = lazy_import('pdfminer.high_level').extract_pages
+        text_container = lazy_import('pdfminer.layout').LTTextContainer
+        for layout in extract_pages(io.BytesIO(data)):
+            yield ''.join(element.get_text() for element in layout if isinstance(element, text_container))
+    else:
+        for page in lazy_import('PyPDF2').PdfReader(io.BytesIO(data)).pages:
+            yield page.extract_text()
+
+
+# Contact details are almost always near the top, so that region is
+# scanned first in one pass for both fields
+CONTACT_HEADER_CHARS = 2000
+# Overlap when falling back past the header, so a match cut by it is found
+CONTACT_OVERLAP = 64
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_PATTERN = re.compile(
+    r'(?<!\d)(?:\+(\d{1,3})[-.\s]?)?\(?(\d{3})\)?[-.\s]?(\d{3})[-.\s]?(\d{4})(?!\d)'
+)
+CONTACT_PATTERN = re.compile(
+    f'(?P<email>{EMAIL_PATTERN.pattern})|(?P<phone>{PHONE_PATTERN.pattern})'
+)
+
+# Country code for numbers written without one, e.g. '1' or '91'; unset
+# leaves them as national digits rather than guessing a country
+PHONE_COUNTRY_CODE = os.getenv('PHONE_COUNTRY_CODE', '')
+
+
+def normalize_phone(phone, country_code=None):
+    """E.164 form of a PHONE_PATTERN match, e.g. '+1 (555) 123-4567' -> '+15551234567'
+
+    Without a country code configured, numbers written without one keep
+    their ten national digits.
+    """
+    digits = ''.join(char for char in phone if char.isdigit())
+    # The pattern only allows a country code after '+', ahead of ten digits
+    code = digits[:-10] or (PHONE_COUNTRY_CODE if country_code is None else country_code)
+    return f"+{code}{digits[-10:]}" if code else digits
+
+
+# NER only looks at the top of the resume, where the candidate's name is
+NER_HEADER_CHARS = 1000
+
+# Heuristic name lines that are really section headings
+NAME_STOPWORDS = {
+    'resume', 'curriculum', 'vitae', 'cv', 'summary', 'profile', 'objective', 'contact',
+    'education', 'experience', 'skills', 'projects', 'about', 'me', 'professional'
+}
+
+# Pipes not needed for PERSON entities; tok2vec and ner stay
+NER_EXCLUDED_PIPES = ['parser', 'tagger', 'lemmatizer', 'attribute_ruler', 'morphologizer',
+                      'senter', 'textcat']
+
+_ner_models = {}
+
+
+def load_ner_model(name):
+    """Load a spaCy model once per process with unneeded pipes excluded"""
+    if name not in _ner_models:
+        spacy = lazy_import('spacy')
+        _ner_models[name] = spacy.load(name, exclude=NER_EXCLUDED_PIPES)
+    return _ner_models[name]
+
 
 class ResumeParser:
-    def __init__(self):
-        self.nlp = None  # NLP functionality disabled for now
+    def __init__(self, pdf_backend=None, early_exit=False, max_pages=None, ner_model=None, max_chars=None):
+        # Optional spaCy model name (e.g. en_core_web_sm) for NER name extraction
+        self.ner_model = ner_model if ner_model is not None else os.getenv('RESUME_NER_MODEL')
+        self._nlp = None
+        self.pdf_backend = available_pdf_backend(pdf_backend or os.getenv('PDF_BACKEND'))
+        # Stop reading PDF pages once email and phone are found; skills
+        # then come from the pages read so far
+        self.early_exit = early_exit
+        # Budgets: extraction stops at max_pages / max_chars and the text
+        # is marked truncated in last_extraction
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.last_extraction = None
+    
+    @metrics.timed('parse_resume')
+    def parse_resume(self, source):
+        """Parse resume and extract only essential information
+
+        source may be a file path, the file's bytes or a binary file-like
+        object such as an uploaded file's stream.
+        """
+        return self.parse_text(self.extract_text(source))
     
-    def parse_resume(self, file_path):
-        """Parse resume and extract only essential information"""
-        file_extension = file_path.split('.')[-1].lower()
+    @metrics.timed('extract_text')
+    def extract_text(self, source):
+        """Extract raw text based on the file's magic bytes
+
+        last_extraction then describes this file's extraction only.
+        """
+        self.last_extraction = None
+        data = read_source(source)
+        file_format = detect_format(data)
         
-        if file_extension == 'pdf':
-            text = self.extract_text_from_pdf(file_path)
-        elif file_extension == 'docx':
-            text = self.extract_text_from_docx(file_path)
-        elif file_extension == 'txt':
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
+        if file_format == 'pdf':
+            return self.extract_text_from_pdf(data)
+        elif file_format == 'docx':
+            return self.extract_text_from_docx(data)
         else:
-            raise ValueError("Unsupported file format")
+            return self.extract_text_from_txt(data)
+    
+    def parse_text(self, text):
+        """Extract essential fields from already extracted text"""
+        return self.parse_texts([text])[0]
+    
+    @metrics.timed('parse_texts')
+    def parse_texts(self, texts):
+        """Extract essential fields from many texts, batching NER name extraction"""
+        names = self.extract_names(texts)
+        fields = []
+        for name, text in zip(names, texts):
+            email, phone = self.extract_contact(text)
+            fields.append({
+                'name': name,
+                'email': email,
+                'phone': phone,
+                'skills': self.extract_skills(text)  # Needed for ATS scoring
+            })
+        return fields
+    
+    @property
+    def nlp(self):
+        """Shared spaCy pipeline, loaded on first use when NER is enabled"""
+        if self._nlp is None and self.ner_model:
+            self._nlp = load_ner_model(self.ner_model)
+        return self._nlp
+    
+    @metrics.timed('extract_text_from_pdf')
+    def extract_text_from_pdf(self, data):
+        """Extract text from PDF bytes, recording page count and time per page"""
+        start = time.perf_counter()
+        pages = []
+        chars = 0
+        truncated = None
+        found = {'email': False, 'phone': False}
+        for page_text in iter_pdf_pages(data, self.pdf_backend):
+            if self.max_pages and len(pages) >= self.max_pages:
+                truncated = 'max_pages'
+                break
+            pages.append(page_text or '')
+            chars += len(pages[-1])
+            if self.max_chars and chars > self.max_chars:
+                truncated = 'max_chars'
+                break
+            if self.early_exit and self._contact_fields_found(found, pages):
+                break
         
-        # Extract only essential data
-        data = {
-            'name': self.extract_name(text),
-            'email': self.extract_email(text),
-            'phone': self.extract_phone(text),
-            'skills': self.extract_skills(text)  # Needed for ATS scoring
+        elapsed = time.perf_counter() - start
+        self.last_extraction = {
+            'backend': self.pdf_backend,
+            'pages': len(pages),
+            'seconds': round(elapsed, 4),
+            'seconds_per_page': round(elapsed / len(pages), 4) if pages else 0,
+            'truncated': truncated
         }
+        text = ''.join(pages)
+        return text[:self.max_chars] if self.max_chars else text
+    
+    def _contact_fields_found(self, found, pages):
+        """Update found with the newest page and report whether all are present
+
+        The name heuristic only reads the first lines, which are on page one.
+        """
+        email, phone = self.extract_contact(pages[-1])
+        found['email'] = found['email'] or email != "Not found"
+        found['phone'] = found['phone'] or phone != "Not found"
+        return all(found.values())
+    
+    @metrics.timed('extract_text_from_docx')
+    def extract_text_from_docx(self, data):
+        """Extract text from DOCX bytes, up to max_chars"""
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            if sum(info.file_size for info in archive.infolist()) > DOCX_MAX_EXPANDED_BYTES:
+                raise ValueError(f"DOCX expands to more than {DOCX_MAX_EXPANDED_BYTES} bytes")
         
-        return data
-    
-    def extract_text_from_pdf(self, file_path):
-        """Extract text from PDF"""
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
+        doc = lazy_import('docx').Document(io.BytesIO(data))
+        parts = []
+        chars = 0
+        truncated = None
+        for paragraph in doc.paragraphs:
+            parts.append(paragraph.text + "\n")
+            chars += len(parts[-1])
+            if self.max_chars and chars > self.max_chars:
+                truncated = 'max_chars'
+                break
+        text = ''.join(parts)[:self.max_chars] if truncated else ''.join(parts)
+        self.last_extraction = {'chars': len(text), 'truncated': truncated}
         return text
     
-    def extract_text_from_docx(self, file_path):
-        """Extract text from DOCX"""
-        doc = Document(file_path)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
+    def extract_text_from_txt(self, data):
+        """Decode UTF-8 text, up to max_chars"""
+        # A character is at most four bytes, so longer input is cut before decoding
+        if self.max_chars and len(data) > self.max_chars * 4:
+            text = data[:self.max_chars * 4].decode('utf-8', errors='ignore')
+        else:
+            text = data.decode('utf-8')
+        truncated = None
+        if self.max_chars and len(text) > self.max_chars:
+            truncated = 'max_chars'
+            text = text[:self.max_chars]
+        self.last_extraction = {'chars': len(text), 'truncated': truncated}
         return text
     
     def extract_name(self, text):
         """Extract name using NLP or basic patterns"""
-        if self.nlp:
-            doc = self.nlp(text)
-            for ent in doc.ents:
-                if ent.label_ == "PERSON":
-                    return ent.text.strip()
+        return self.extract_names([text])[0]
+    
+    @metrics.timed('extract_names')
+    def extract_names(self, texts):
+        """Extract names for many texts, running NER in one nlp.pipe batch
+
+        The line heuristic runs first; NER only sees the header of texts
+        where the heuristic is not confident.
+        """
+        names = [self._heuristic_name(text) for text in texts]
+        if not self.ner_model:
+            return names
         
-        # Basic pattern matching
-        lines = text.split('\n')
-        for line in lines[:10]:
+        pending = [index for index, name in enumerate(names) if not self._confident_name(name)]
+        if pending:
+            headers = (texts[index][:NER_HEADER_CHARS] for index in pending)
+            for index, doc in zip(pending, self.nlp.pipe(headers, batch_size=32)):
+                for ent in doc.ents:
+                    if ent.label_ == "PERSON":
+                        names[index] = ent.text.strip()
+                        break
+        return names
+    
+    def _heuristic_name(self, text):
+        """Basic pattern matching over the first lines"""
+        for line in text.split('\n', 10)[:10]:
             line = line.strip()
             if len(line.split()) <= 4 and line.replace(' ', '').isalpha():
                 return line
         return "Not found"
     
+    @staticmethod
+    def _confident_name(name):
+        """Two to four capitalised words that are not a section heading"""
+        words = name.split()
+        return (
+            2 <= len(words) <= 4
+            and all(word[0].isupper() for word in words)
+            and not any(word.lower() in NAME_STOPWORDS for word in words)
+        )
+    
+    @metrics.timed('extract_contact')
+    def extract_contact(self, text):
+        """Return (email, phone), scanning the header once for both
+
+        Only a field missing from the header is searched for in the rest
+        of the text. Each search stops at its first match.
+        """
+        email = phone = None
+        rest = CONTACT_HEADER_CHARS - CONTACT_OVERLAP
+        for match in CONTACT_PATTERN.finditer(text, 0, CONTACT_HEADER_CHARS):
+            if match.end() == CONTACT_HEADER_CHARS and len(text) > CONTACT_HEADER_CHARS:
+                # The header's end may have cut this match short, so what
+                # is still missing is searched for again from its start
+                rest = min(rest, match.start())
+                break
+            if match.lastgroup == 'email':
+                email = email or match.group()
+            else:
+                phone = phone or match.group()
+            if email and phone:
+                break
+        
+        if len(text) > CONTACT_HEADER_CHARS:
+            if email is None:
+                match = EMAIL_PATTERN.search(text, rest)
+                email = match.group() if match else None
+            if phone is None:
+                match = PHONE_PATTERN.search(text, rest)
+                phone = match.group() if match else None
+        
+        return email or "Not found", normalize_phone(phone) if phone else "Not found"
+    
+    @metrics.timed('extract_email')
     def extract_email(self, text):
-        """Extract email addresses"""
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-        return emails[0] if emails else "Not found"
+        """Extract the first email address"""
+        match = EMAIL_PATTERN.search(text)
+        return match.group() if match else "Not found"
     
+    @metrics.timed('extract_phone')
     def extract_phone(self, text):
-        """Extract phone numbers"""
-        phone_pattern = r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        phones = re.findall(phone_pattern, text)
-        return phones[0] if phones else "Not found"
+        """Extract the first phone number in E.164 form"""
+        match = PHONE_PATTERN.search(text)
+        return normalize_phone(match.group()) if match else "Not found"
     
+    @metrics.timed('extract_skills')
     def extract_skills(self, text):
         """Extract skills for ATS scoring"""
-        skills = [
-            'Python', 'JavaScript', 'Java', 'C++', 'C#', 'PHP', 'Ruby', 'Go',
-            'React', 'Angular', 'Vue', 'Node.js', 'Django', 'Flask', 'Express',
-            'MySQL', 'PostgreSQL', 'MongoDB', 'AWS', 'Azure', 'Docker', 'Kubernetes',
-            'Git', 'HTML', 'CSS', 'Bootstrap', 'jQuery', 'TypeScript'
-        ]
-        
-        found_skills = []
-        text_lower = text.lower()
-        for skill in skills:
-            if skill.lower() in text_lower:
-                found_skills.append(skill)
-        
-        return ', '.join(found_skills) if found_skills else "Not found"
\ No newline at end of file
+        found_skills = get_taxonomy().vocabulary.find(text)
+        return ', '.join(found_skills) if found_skills else "Not found"
@@ -0,0 +1,557 @@
+import base64
+import json
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+import metrics
+from minhash import band_hashes, similarity
+from skill_query import SkillQuery
+
+COLUMNS = ['Name', 'Email', 'Phone Number', 'ATS Score']
+
+# Score histogram buckets: band b holds scores in [10b, 10b + 10), 100 in band 9
+SCORE_BANDS = 10
+_BAND_SQL = 'MIN(CAST({score} / 10 AS INTEGER), 9)'
+
+# What to do with a new resume whose text nearly matches a stored one and
+# whose email does not: 'link' stores it pointing at the original,
+# 'merge' updates the original in place, 'off' skips the lookup
+DUPLICATE_POLICIES = ('off', 'link', 'merge')
+DUPLICATE_POLICY = os.getenv('DUPLICATE_POLICY', 'link')
+DUPLICATE_THRESHOLD = float(os.getenv('DUPLICATE_THRESHOLD', '0.8'))
+
+FTS_WORD_PATTERN = re.compile(r'\w+')
+
+# Listing orders: (ORDER BY clause, keyset columns, direction)
+SORTS = {
+    'added': ('id ASC', ('id',), '>'),
+    'recent': ('id DESC', ('id',), '<'),
+    'score_desc': ('ats_score DESC, id DESC', ('ats_score', 'id'), '<'),
+    'score_asc': ('ats_score ASC, id ASC', ('ats_score', 'id'), '>'),
+}
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def normalize_email(email):
+    """None for a missing email, so such rows never collide on the unique index"""
+    if email is None:
+        return None
+    email = str(email).strip()
+    return email if email and email != 'Not found' else None
+
+
+def format_score(score):
+    """Format a stored score the way the dashboard expects (e.g. '85.5%')"""
+    return f"{float(score):g}%"
+
+
+def parse_score(value):
+    """Accept 85.5, '85.5' or '85.5%' and return a float"""
+    if isinstance(value, str):
+        value = value.strip().rstrip('%')
+    return float(value) if value not in (None, '') else 0.0
+
+
+class ResumeStore:
+    """SQLite-backed candidate store with a unique index on email
+
+    Resumes without an email are stored with a NULL one. Near-duplicates
+    are found through MinHash LSH buckets in resume_bands.
+    """
+
+    def __init__(self, db_path, busy_timeout=30, duplicate_policy=None, duplicate_threshold=None):
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.duplicate_policy = duplicate_policy or DUPLICATE_POLICY
+        if self.duplicate_policy not in DUPLICATE_POLICIES:
+            raise ValueError(f'Unknown duplicate policy: {self.duplicate_policy}')
+        self.duplicate_threshold = DUPLICATE_THRESHOLD if duplicate_threshold is None else duplicate_threshold
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._create_schema()
+
+    def _connect(self):
+        """Return a connection owned by the current thread and process"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            # Autocommit mode; writes take the lock up front in _transaction
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction safe across threads and processes
+
+        BEGIN IMMEDIATE takes the write lock before the first read, so a
+        read-then-write upsert never fails to upgrade its lock while
+        another writer commits; concurrent writers wait up to
+        busy_timeout seconds instead.
+        """
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    @contextmanager
+    def _snapshot(self):
+        """Read transaction so multi-statement reads see one consistent state"""
+        conn = self._connect()
+        conn.execute('BEGIN')
+        try:
+            yield conn
+        finally:
+            conn.execute('COMMIT')
+
+    def _create_schema(self):
+        with self._transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS resumes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT,
+                    email TEXT,
+                    phone TEXT,
+                    ats_score REAL NOT NULL DEFAULT 0,
+                    skills TEXT,
+                    missing_skills TEXT,
+                    signature BLOB,
+                    duplicate_of INTEGER,
+                    created_at TEXT,
+                    updated_at TEXT
+                )
+            ''')
+            conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_resumes_email ON resumes(email)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS resume_bands (
+                    band INTEGER NOT NULL,
+                    hash INTEGER NOT NULL,
+                    resume_id INTEGER NOT NULL,
+                    PRIMARY KEY (band, hash, resume_id)
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_resume_bands_resume ON resume_bands(resume_id)')
+            self._create_search_index(conn)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_resumes_score ON resumes(ats_score, id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_resumes_name ON resumes(name COLLATE NOCASE)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_resumes_email_nocase ON resumes(email COLLATE NOCASE)')
+            self._create_aggregates(conn)
+
+    def _create_search_index(self, conn):
+        """Skill posting lists and an FTS5 index over the extracted text"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS resume_skills (
+                skill TEXT NOT NULL,
+                resume_id INTEGER NOT NULL,
+                PRIMARY KEY (skill, resume_id)
+            ) WITHOUT ROWID
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_resume_skills_resume ON resume_skills(resume_id)')
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts USING fts5(text, tokenize='porter unicode61')")
+
+    @staticmethod
+    def _index_skills(conn, resume_id, skills):
+        conn.execute('DELETE FROM resume_skills WHERE resume_id = ?', (resume_id,))
+        terms = {skill.strip().lower() for skill in skills.split(',')} - {'', 'not found'}
+        conn.executemany('INSERT INTO resume_skills (skill, resume_id) VALUES (?, ?)',
+                         [(term, resume_id) for term in terms])
+
+    @staticmethod
+    def _index_text(conn, resume_id, text):
+        conn.execute('DELETE FROM resume_fts WHERE rowid = ?', (resume_id,))
+        conn.execute('INSERT INTO resume_fts (rowid, text) VALUES (?, ?)', (resume_id, text))
+
+    def _create_aggregates(self, conn):
+        """Running count, score sum and histogram kept current by triggers"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS resume_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total INTEGER NOT NULL,
+                score_sum REAL NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        conn.execute('CREATE TABLE IF NOT EXISTS score_bands (band INTEGER PRIMARY KEY, count INTEGER NOT NULL)')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS missing_skill_counts (
+                skill TEXT PRIMARY KEY,
+                count INTEGER NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_missing_skill_counts ON missing_skill_counts(count)')
+
+        new_band = _BAND_SQL.format(score='NEW.ats_score')
+        old_band = _BAND_SQL.format(score='OLD.ats_score')
+        triggers = {
+            'resumes_stats_insert': f'''
+                AFTER INSERT ON resumes BEGIN
+                    UPDATE resume_stats SET total = total + 1, score_sum = score_sum + NEW.ats_score,
+                                            version = version + 1;
+                    UPDATE score_bands SET count = count + 1 WHERE band = {new_band};
+                END
+            ''',
+            'resumes_stats_delete': f'''
+                AFTER DELETE ON resumes BEGIN
+                    UPDATE resume_stats SET total = total - 1, score_sum = score_sum - OLD.ats_score,
+                                            version = version + 1;
+                    UPDATE score_bands SET count = count - 1 WHERE band = {old_band};
+                END
+            ''',
+            'resumes_stats_update': f'''
+                AFTER UPDATE OF ats_score ON resumes BEGIN
+                    UPDATE resume_stats SET score_sum = score_sum - OLD.ats_score + NEW.ats_score;
+                    UPDATE score_bands SET count = count - 1 WHERE band = {old_band};
+                    UPDATE score_bands SET count = count + 1 WHERE band = {new_band};
+                END
+            ''',
+            'resumes_version_update': '''
+                AFTER UPDATE ON resumes BEGIN
+                    UPDATE resume_stats SET version = version + 1;
+                END
+            ''',
+            'resumes_bands_delete': '''
+                AFTER DELETE ON resumes BEGIN
+                    DELETE FROM resume_bands WHERE resume_id = OLD.id;
+                END
+            ''',
+            'resumes_search_delete': '''
+                AFTER DELETE ON resumes BEGIN
+                    DELETE FROM resume_skills WHERE resume_id = OLD.id;
+                    DELETE FROM resume_fts WHERE rowid = OLD.id;
+                END
+            ''',
+        }
+        for name, body in triggers.items():
+            conn.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+
+        if conn.execute('SELECT COUNT(*) FROM resume_stats').fetchone()[0] == 0:
+            self._rebuild_aggregates(conn)
+
+    def _rebuild_aggregates(self, conn):
+        """Recompute the aggregates from scratch (new or cleared stores)"""
+        version = self._version(conn)
+        conn.execute('DELETE FROM resume_stats')
+        conn.execute('''
+            INSERT INTO resume_stats (id, total, score_sum, version)
+            SELECT 1, COUNT(*), COALESCE(SUM(ats_score), 0), ? FROM resumes
+        ''', (version + 1,))
+        conn.execute('DELETE FROM score_bands')
+        conn.executemany('INSERT INTO score_bands (band, count) VALUES (?, 0)',
+                         [(band,) for band in range(SCORE_BANDS)])
+        conn.execute(f'''
+            UPDATE score_bands SET count = (
+                SELECT COUNT(*) FROM resumes WHERE {_BAND_SQL.format(score='ats_score')} = score_bands.band
+            )
+        ''')
+        conn.execute('DELETE FROM missing_skill_counts')
+        for row in conn.execute('SELECT missing_skills FROM resumes WHERE missing_skills IS NOT NULL').fetchall():
+            self._count_missing(conn, row[0], 1)
+
+    @staticmethod
+    def _version(conn):
+        row = conn.execute('SELECT version FROM resume_stats').fetchone()
+        return row[0] if row else 0
+
+    def version(self):
+        """Counter bumped by every write, usable as a cache validator"""
+        return self._version(self._connect())
+
+    @staticmethod
+    def _count_missing(conn, missing_skills, delta):
+        skills = [skill for skill in (missing_skills or '').split(', ') if skill]
+        if not skills:
+            return
+        conn.executemany('''
+            INSERT INTO missing_skill_counts (skill, count) VALUES (?, ?)
+            ON CONFLICT(skill) DO UPDATE SET count = count + excluded.count
+        ''', [(skill, delta) for skill in skills])
+        if delta < 0:
+            conn.execute('DELETE FROM missing_skill_counts WHERE count <= 0')
+
+    def upsert(self, row):
+        """Insert or update a single candidate keyed by email"""
+        self.upsert_many([row])
+
+    @metrics.timed('store_upsert')
+    def upsert_many(self, rows):
+        """Insert or update a batch of candidates in one transaction
+
+        A row updates the candidate with the same email. Failing that, a
+        row carrying a MinHash 'Signature' is checked against the LSH
+        buckets: an identical signature updates that row, and a
+        near-duplicate is linked to or merged into according to the
+        duplicate policy.
+        """
+        if not rows:
+            return 0
+        now = datetime.utcnow().isoformat(timespec='seconds')
+        with self._transaction() as conn:
+            for row in rows:
+                email = normalize_email(row['Email'])
+                signature = row.get('Signature')
+                missing = row.get('Missing Skills')
+                if isinstance(missing, list):
+                    missing = ', '.join(missing)
+
+                target = None
+                duplicate_of = None
+                if email is not None:
+                    target = conn.execute(
+                        'SELECT id, missing_skills FROM resumes WHERE email = ?', (email,)
+                    ).fetchone()
+                if target is None and signature and self.duplicate_policy != 'off':
+                    match = self._find_duplicate(conn, signature)
+                    # The same content re-scored updates its row under either policy
+                    if match is not None and (self.duplicate_policy == 'merge' or match['signature'] == signature):
+                        target = match
+                    elif match is not None:
+                        duplicate_of = match['duplicate_of'] or match['id']
+
+                if missing is not None:
+                    if target is not None:
+                        self._count_missing(conn, target['missing_skills'], -1)
+                    self._count_missing(conn, missing, 1)
+
+                values = (row['Name'], email, row['Phone Number'], parse_score(row['ATS Score']),
+                          row.get('Skills'), missing, signature)
+                if target is not None:
+                    resume_id = target['id']
+                    conn.execute('''
+                        UPDATE resumes SET
+                            name = ?,
+                            email = COALESCE(?, email),
+                            phone = ?,
+                            ats_score = ?,
+                            skills = COALESCE(?, skills),
+                            missing_skills = COALESCE(?, missing_skills),
+                            signature = COALESCE(?, signature),
+                            updated_at = ?
+                        WHERE id = ?
+                    ''', values + (now, resume_id))
+                else:
+                    resume_id = conn.execute('''
+                        INSERT INTO resumes (name, email, phone, ats_score, skills, missing_skills,
+                                             signature, duplicate_of, created_at, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', values + (duplicate_of, now, now)).lastrowid
+
+                if row.get('Skills') is not None:
+                    self._index_skills(conn, resume_id, row['Skills'])
+                if row.get('Text'):
+                    self._index_text(conn, resume_id, row['Text'])
+                if signature:
+                    conn.execute('DELETE FROM resume_bands WHERE resume_id = ?', (resume_id,))
+                    conn.executemany(
+                        'INSERT OR IGNORE INTO resume_bands (band, hash, resume_id) VALUES (?, ?, ?)',
+                        [(band, value, resume_id) for band, value in band_hashes(signature)]
+                    )
+        return len(rows)
+
+    def _find_duplicate(self, conn, signature):
+        """Most similar stored resume at or above the threshold, or None
+
+        Only resumes sharing an LSH bucket are compared, so the cost
+        depends on the number of near matches, not the store size.
+        """
+        candidate_ids = set()
+        for band, value in band_hashes(signature):
+            candidate_ids.update(row[0] for row in conn.execute(
+                'SELECT resume_id FROM resume_bands WHERE band = ? AND hash = ?', (band, value)
+            ))
+        if not candidate_ids:
+            return None
+
+        best, best_similarity = None, self.duplicate_threshold
+        placeholders = ', '.join('?' * len(candidate_ids))
+        for row in conn.execute(
+            f'SELECT id, duplicate_of, missing_skills, signature FROM resumes WHERE id IN ({placeholders})',
+            sorted(candidate_ids)
+        ):
+            score = similarity(signature, row['signature'])
+            if score >= best_similarity:
+                best, best_similarity = row, score
+        return best
+
+    def count(self):
+        return self._connect().execute('SELECT total FROM resume_stats').fetchone()[0]
+
+    def stats(self, breakdown=False, top_missing=10):
+        """Return total, average score and the number of 80%+ candidates
+
+        Served from the trigger-maintained aggregates, so the cost does not
+        grow with the number of stored candidates.
+        """
+        with self._snapshot() as conn:
+            total, score_sum = conn.execute('SELECT total, score_sum FROM resume_stats').fetchone()
+            bands = [row[0] for row in conn.execute('SELECT count FROM score_bands ORDER BY band')]
+            stats = {
+                'total': total,
+                'average': score_sum / total if total else 0,
+                'high_scores': sum(bands[8:])
+            }
+            if breakdown:
+                stats['bands'] = [
+                    {'band': f'{band * 10}-{band * 10 + 10}%', 'count': count}
+                    for band, count in enumerate(bands)
+                ]
+                stats['top_missing_skills'] = [
+                    {'skill': row[0], 'count': row[1]}
+                    for row in conn.execute(
+                        'SELECT skill, count FROM missing_skill_counts ORDER BY count DESC, skill LIMIT ?',
+                        (top_missing,)
+                    )
+                ]
+        return stats
+
+    def page(self, limit=100, cursor=None, sort='added', min_score=None, max_score=None, prefix=None):
+        """Return (records, next_cursor) for one page of candidates
+
+        Uses keyset pagination over the score and name/email indexes, so
+        deep pages cost the same as the first one.
+        """
+        if sort not in SORTS:
+            raise ValueError(f'Unknown sort: {sort}')
+        order_by, keys, direction = SORTS[sort]
+
+        where, params = [], []
+        if min_score is not None:
+            where.append('ats_score >= ?')
+            params.append(float(min_score))
+        if max_score is not None:
+            where.append('ats_score <= ?')
+            params.append(float(max_score))
+        if prefix:
+            pattern = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            where.append("(name LIKE ? ESCAPE '\\' OR email LIKE ? ESCAPE '\\')")
+            params.extend([pattern, pattern])
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != len(keys):
+                raise ValueError('Invalid cursor')
+            where.append(f"({', '.join(keys)}) {direction} ({', '.join('?' * len(keys))})")
+            params.extend(values)
+
+        sql = 'SELECT id, name, email, phone, ats_score, duplicate_of FROM resumes'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += f' ORDER BY {order_by} LIMIT ?'
+        params.append(limit + 1)
+
+        rows = self._connect().execute(sql, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1][key] for key in keys])
+        return [self._to_record(row) for row in rows], next_cursor
+
+    def search(self, skills=None, text=None, limit=50, normalize=None):
+        """Return records matching a boolean skill query and/or ranked text query
+
+        skills is parsed by SkillQuery, e.g. 'kubernetes AND (go OR rust)',
+        with normalize applied to each term. text is matched word by word
+        against the stored resume text and results are ordered by bm25
+        relevance; without it they are ordered by score.
+        """
+        where, params = [], []
+        if skills:
+            skill_sql, skill_params = SkillQuery(skills, normalize).to_sql()
+            where.append(f'resumes.id IN ({skill_sql})')
+            params.extend(skill_params)
+
+        columns = 'resumes.id, name, email, phone, ats_score, duplicate_of'
+        if text:
+            words = FTS_WORD_PATTERN.findall(text)
+            if not words:
+                raise ValueError('Empty text query')
+            sql = (f'SELECT {columns}, -bm25(resume_fts) AS relevance FROM resume_fts '
+                   f'JOIN resumes ON resumes.id = resume_fts.rowid WHERE resume_fts MATCH ?')
+            params.insert(0, ' '.join(f'"{word}"' for word in words))
+            order_by = 'bm25(resume_fts)'
+        elif where:
+            sql = f'SELECT {columns} FROM resumes WHERE 1'
+            order_by = 'ats_score DESC, resumes.id DESC'
+        else:
+            raise ValueError('Provide a skill query or a text query')
+
+        for clause in where:
+            sql += f' AND {clause}'
+        sql += f' ORDER BY {order_by} LIMIT ?'
+        params.append(limit)
+
+        records = []
+        for row in self._connect().execute(sql, params):
+            record = self._to_record(row)
+            if text:
+                record['relevance'] = round(row['relevance'], 4)
+            records.append(record)
+        return records
+
+    def iter_records(self, batch_size=1000, **filters):
+        """Yield every matching record, reading one page at a time"""
+        cursor = None
+        while True:
+            records, cursor = self.page(limit=batch_size, cursor=cursor, **filters)
+            yield from records
+            if cursor is None:
+                return
+
+    def candidates(self):
+        """Return (record, skills) for every candidate with stored skills"""
+        cursor = self._connect().execute(
+            'SELECT name, email, phone, ats_score, skills FROM resumes WHERE skills IS NOT NULL ORDER BY id'
+        )
+        return [(self._to_record(row), row['skills']) for row in cursor]
+
+    @metrics.timed('store_clear')
+    def clear(self):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM resumes')
+            self._rebuild_aggregates(conn)
+
+    def import_excel(self, path):
+        """Load rows from a legacy all_resumes.xlsx workbook"""
+        import pandas as pd
+
+        df = pd.read_excel(path)
+        if list(df.columns) != COLUMNS:
+            return 0
+        df = df.astype(object).where(df.notna(), '')
+        return self.upsert_many(df.to_dict('records'))
+
+    @staticmethod
+    def _to_record(row):
+        record = {
+            'Name': row['name'],
+            'Email': row['email'] or 'Not found',
+            'Phone Number': row['phone'],
+            'ATS Score': format_score(row['ats_score'])
+        }
+        if 'duplicate_of' in row.keys():
+            record['id'] = row['id']
+            record['duplicate_of'] = row['duplicate_of']
+        return record
@@ -0,0 +1,170 @@
+import os
+import subprocess
+import sys
+import threading
+from multiprocessing.connection import Connection
+import metrics
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Idle workers kept per process for reuse; busier moments start more
+MAX_IDLE_WORKERS = 4
+
+
+class BudgetExceeded(Exception):
+    """A file ran past its parsing budget; reason is 'timeout' or 'memory'"""
+
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason
+
+
+def available():
+    """Workers talk over inherited pipe descriptors, so POSIX only"""
+    return os.name == 'posix'
+
+
+def _address_space():
+    """Current virtual size in bytes; the memory limit is set above it"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _call(fn, args, memory_bytes):
+    """Run one request inside the worker with its address space capped"""
+    limit = None
+    current = _address_space()
+    if memory_bytes and resource is not None and current is not None:
+        limit = resource.getrlimit(resource.RLIMIT_AS)
+        # Only the soft limit moves, so it can be lifted again afterwards
+        resource.setrlimit(resource.RLIMIT_AS, (current + memory_bytes, limit[1]))
+    try:
+        return ('ok', fn(*args))
+    except MemoryError:
+        return ('memory', f'Parsing exceeded the {memory_bytes // (1024 * 1024)}MB memory budget')
+    except Exception as e:
+        return ('error', f'{type(e).__name__}: {e}')
+    finally:
+        if limit is not None:
+            resource.setrlimit(resource.RLIMIT_AS, limit)
+
+
+def serve(read_fd, write_fd):
+    """Worker loop: answer (fn, args, memory_bytes) requests until the parent goes away"""
+    requests = Connection(read_fd, writable=False)
+    responses = Connection(write_fd, readable=False)
+    while True:
+        try:
+            fn, args, memory_bytes = requests.recv()
+        except EOFError:
+            return
+        except Exception as e:
+            outcome = ('error', f'{type(e).__name__}: {e}')
+        else:
+            outcome = _call(fn, args, memory_bytes)
+        responses.send((outcome, metrics.REGISTRY.drain()))
+        if outcome[0] == 'memory':
+            # The heap may be left fragmented, so the next file gets a fresh worker
+            return
+
+
+class Worker:
+    """A long-lived interpreter that runs calls and can be killed mid-call
+
+    Started with subprocess rather than fork, so creating one from a
+    threaded server cannot inherit a lock held by another thread, and
+    reused across files so a call costs one pipe round trip.
+    """
+
+    def __init__(self):
+        request_read, request_write = os.pipe()
+        response_read, response_write = os.pipe()
+        try:
+            self.process = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), str(request_read), str(response_write)],
+                pass_fds=(request_read, response_write), stdin=subprocess.DEVNULL,
+                # Same import path as this process, so fn can be found by name
+                env={**os.environ, 'PYTHONPATH': os.pathsep.join(path for path in sys.path if path)}
+            )
+        finally:
+            os.close(request_read)
+            os.close(response_write)
+        self.requests = Connection(request_write, readable=False)
+        self.responses = Connection(response_read, writable=False)
+
+    def call(self, fn, args, timeout, memory_bytes):
+        """Return (outcome, samples), killing the worker if timeout passes first"""
+        try:
+            self.requests.send((fn, args, memory_bytes))
+            if not self.responses.poll(timeout):
+                self.close()
+                raise BudgetExceeded('timeout', f'Parsing exceeded the {timeout:g}s time budget')
+            return self.responses.recv()
+        except (EOFError, OSError):
+            self.close()
+            raise RuntimeError(f'Parser process exited unexpectedly (status {self.process.returncode})')
+
+    def close(self):
+        self.requests.close()
+        self.responses.close()
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+
+
+_idle = []
+_idle_lock = threading.Lock()
+
+
+def _forget_workers():
+    # A forked child must not share its parent's pipes; closing its
+    # copies leaves the parent's workers running
+    for worker in _idle:
+        worker.requests.close()
+        worker.responses.close()
+    _idle.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_workers)
+
+
+def run(fn, args=(), timeout=30, memory_bytes=None):
+    """Run fn(*args) in a worker process limited in wall time and memory
+
+    The worker is killed once timeout seconds pass, and running out of
+    memory retires it; both raise BudgetExceeded and the next call starts
+    a fresh worker. An exception inside fn comes back as a RuntimeError
+    carrying its message. fn must be importable by name, and its
+    arguments and return value picklable.
+    """
+    with _idle_lock:
+        worker = _idle.pop() if _idle else None
+    if worker is None:
+        worker = Worker()
+
+    (kind, value), samples = worker.call(fn, args, timeout, memory_bytes)
+    metrics.merge(samples)
+    if kind == 'memory':
+        worker.close()
+        raise BudgetExceeded('memory', value)
+
+    with _idle_lock:
+        if len(_idle) < MAX_IDLE_WORKERS:
+            _idle.append(worker)
+            worker = None
+    if worker is not None:
+        worker.close()
+    if kind == 'error':
+        raise RuntimeError(value)
+    return value
+
+
+if __name__ == '__main__':
+    serve(int(sys.argv[1]), int(sys.argv[2]))
@@ -0,0 +1,115 @@
+import re
+
+# Quoted phrases, parentheses, commas, or runs of other characters
+TOKEN_PATTERN = re.compile(r'"([^"]*)"|([(),])|([^\s(),"]+)')
+OPERATORS = {'AND', 'OR', 'NOT'}
+
+
+def tokenize(query):
+    """Split a skill query into operators, parentheses and skill terms
+
+    Operators are only recognised in upper case. Consecutive bare words
+    form one multi-word skill ("machine learning"), and a comma means AND.
+    """
+    tokens = []
+    words = []
+    for phrase, punct, word in TOKEN_PATTERN.findall(query):
+        if word and word not in OPERATORS:
+            words.append(word)
+            continue
+        if words:
+            tokens.append(('term', ' '.join(words)))
+            words = []
+        if phrase:
+            tokens.append(('term', phrase))
+        elif punct == ',':
+            tokens.append(('op', 'AND'))
+        elif punct:
+            tokens.append((punct, punct))
+        else:
+            tokens.append(('op', word))
+    if words:
+        tokens.append(('term', ' '.join(words)))
+    return tokens
+
+
+class SkillQuery:
+    """Boolean query over skills: AND, OR, NOT and parentheses
+
+    Parsed into nested tuples: ('term', skill), ('and', a, b),
+    ('or', a, b) or ('not', a). AND binds tighter than OR, and operands
+    written side by side are ANDed, so "a NOT b" means "a AND NOT b".
+    """
+
+    def __init__(self, query, normalize=None):
+        self.normalize = normalize or (lambda term: term)
+        self.tokens = tokenize(query)
+        self.position = 0
+        if not self.tokens:
+            raise ValueError('Empty skill query')
+        self.tree = self._or()
+        if self.position != len(self.tokens):
+            raise ValueError(f'Unexpected {self.tokens[self.position][1]!r} in skill query')
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def _or(self):
+        node = self._and()
+        while self._peek() == ('op', 'OR'):
+            self.position += 1
+            node = ('or', node, self._and())
+        return node
+
+    def _and(self):
+        node = self._not()
+        while True:
+            token = self._peek()
+            if token == ('op', 'AND'):
+                self.position += 1
+            elif token not in (('op', 'NOT'), ('(', '(')) and token[0] != 'term':
+                return node
+            node = ('and', node, self._not())
+
+    def _not(self):
+        if self._peek() == ('op', 'NOT'):
+            self.position += 1
+            return ('not', self._not())
+        return self._atom()
+
+    def _atom(self):
+        kind, value = self._peek()
+        self.position += 1
+        if kind == 'term':
+            return ('term', self.normalize(value.strip().lower()))
+        if kind == '(':
+            node = self._or()
+            if self._peek()[0] != ')':
+                raise ValueError('Missing ) in skill query')
+            self.position += 1
+            return node
+        raise ValueError('Incomplete skill query' if kind is None else f'Unexpected {value!r} in skill query')
+
+    def to_sql(self):
+        """Compound SELECT yielding the matching resume ids, with its parameters
+
+        Each term is one probe of the (skill, resume_id) primary key, and
+        the boolean operators become INTERSECT, UNION and EXCEPT.
+        """
+        params = []
+        return self._sql(self.tree, params), params
+
+    def _sql(self, node, params):
+        kind = node[0]
+        if kind == 'term':
+            params.append(node[1])
+            return 'SELECT resume_id FROM resume_skills WHERE skill = ?'
+        if kind == 'not':
+            return f'SELECT id FROM resumes EXCEPT SELECT * FROM ({self._sql(node[1], params)})'
+        if kind == 'and' and node[2][0] == 'not':
+            # a AND NOT b is a difference, without materialising NOT b
+            left = self._sql(node[1], params)
+            return f'SELECT * FROM ({left}) EXCEPT SELECT * FROM ({self._sql(node[2][1], params)})'
+        operator = 'INTERSECT' if kind == 'and' else 'UNION'
+        left = self._sql(node[1], params)
+        return f'SELECT * FROM ({left}) {operator} SELECT * FROM ({self._sql(node[2], params)})'
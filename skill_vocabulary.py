@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+# Characters that make up a "word" when checking skill boundaries, so
+# 'go' does not match inside 'good' and 'ai' not inside 'maintain'
+_WORD_CHARS = 'a-z0-9'
+
+
+def _trie_pattern(words):
+    """Alternation of words factored into a prefix trie
+
+    re tries a flat alternation's branches one after another at every
+    position, so its cost grows with the number of words. Factored by
+    prefix, each character only picks among the branches that share the
+    prefix so far. Longer words are still tried before their prefixes.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return _node_pattern(trie)
+
+
+def _node_pattern(node):
+    branches = [re.escape(char) + _node_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    if '' not in node:
+        return pattern
+    # A word ends here: greedy '?' tries the longer words first
+    return f'(?:{pattern})?' if len(branches) == 1 else f'{pattern}?'
+
+
+class SkillVocabulary:
+    """A skill list compiled into one boundary-aware regex
+
+    find() scans the text once and returns every vocabulary term that
+    occurs as a whole word, in vocabulary order. Terms nested inside a
+    longer hit (e.g. 'sql' in 'sql server') are reported as well, and
+    aliases (e.g. 'k8s') report the term they stand for.
+    """
+
+    def __init__(self, terms, aliases=None):
+        self.terms = []
+        self._canonical = {}
+        for term in terms:
+            key = term.lower()
+            if key not in self._canonical:
+                self._canonical[key] = term
+                self.terms.append(term)
+        self._order = {term.lower(): index for index, term in enumerate(self.terms)}
+
+        # Every surface form the regex can hit, mapped to its term's key
+        self._surface = {key: key for key in self._canonical}
+        for alias, term in (aliases or {}).items():
+            if term.lower() in self._canonical:
+                self._surface.setdefault(alias.lower(), term.lower())
+        self._nested = {surface: self._nested_terms(surface) for surface in self._surface}
+
+        forms = set(self._surface)
+        # Allow a plain plural ('apis', 'unit tests') for longer terms
+        forms.update(key + 's' for key in self._surface if len(key) >= 3 and key[-1].isalpha())
+        self._pattern = re.compile(
+            rf'(?<![{_WORD_CHARS}]){_trie_pattern(forms)}(?![{_WORD_CHARS}])', re.IGNORECASE
+        )
+
+    def _nested_terms(self, key):
+        """Other terms found at word boundaries inside key"""
+        nested = set()
+        for i in range(len(key)):
+            if not key[i].isalnum() or (i > 0 and key[i - 1].isalnum()):
+                continue
+            for end in range(i + 1, len(key) + 1):
+                if end < len(key) and key[end].isalnum():
+                    continue
+                candidate = key[i:end]
+                if candidate != key and candidate in self._surface:
+                    nested.add(self._surface[candidate])
+        return nested
+
+    def _hit(self, hit):
+        hit = hit.lower()
+        if hit not in self._surface:
+            hit = hit[:-1]  # matched the optional plural 's'
+        return hit
+
+    def find(self, text):
+        """Return the vocabulary terms occurring in text, in vocabulary order"""
+        found = set()
+        for match in self._pattern.finditer(text):
+            hit = self._hit(match.group(0))
+            found.add(self._surface[hit])
+            found.update(self._nested[hit])
+        return [self._canonical[key] for key in sorted(found, key=self._order.__getitem__)]
+
+    def lookup(self, text):
+        """Lowercased term that text names exactly, directly or as an alias, else None"""
+        return self._surface.get(text.lower().strip())
+
+    def __len__(self):
+        return len(self.terms)
+
+
+DEFAULT_TAXONOMY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'skills.json')
+
+# How often a process re-checks the taxonomy file's mtime
+TAXONOMY_CHECK_INTERVAL = 1.0
+
+
+class SkillTaxonomy:
+    """Skill categories, aliases and weights compiled into one shared matcher"""
+
+    def __init__(self, data, version=''):
+        self.version = version
+        self.categories = {}
+        self.category_weights = {}
+        self.category_of = {}
+        skills = []
+        for category, spec in data.get('categories', {}).items():
+            self.category_weights[category] = float(spec.get('weight', 1.0))
+            self.categories[category] = list(spec.get('skills', []))
+            for skill in self.categories[category]:
+                self.category_of.setdefault(skill.lower(), category)
+                skills.append(skill)
+
+        self.aliases = {alias.lower(): term.lower() for alias, term in data.get('aliases', {}).items()}
+        self.skill_weights = {skill.lower(): float(weight) for skill, weight in data.get('weights', {}).items()}
+        self.vocabulary = SkillVocabulary(skills, data.get('aliases', {}))
+
+    @property
+    def skills(self):
+        """Display names of every skill, in taxonomy order"""
+        return self.vocabulary.terms
+
+    def weight(self, skill):
+        """Per-skill weight, falling back to the skill's category weight"""
+        key = skill.lower()
+        if key in self.skill_weights:
+            return self.skill_weights[key]
+        return self.category_weights.get(self.category_of.get(key), 1.0)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            raw = f.read()
+        return cls(json.loads(raw), version=hashlib.sha256(raw).hexdigest()[:12])
+
+
+_taxonomies = {}
+_taxonomy_lock = threading.Lock()
+
+
+def get_taxonomy(path=None):
+    """Return the compiled taxonomy, recompiling only when the file changes
+
+    The file's mtime is checked at most once per TAXONOMY_CHECK_INTERVAL,
+    so edits to data/skills.json are picked up without a restart and
+    without a recompile per request.
+    """
+    path = path or os.getenv('SKILL_TAXONOMY', DEFAULT_TAXONOMY)
+    now = time.monotonic()
+    entry = _taxonomies.get(path)
+    if entry is not None and now - entry['checked'] < TAXONOMY_CHECK_INTERVAL:
+        return entry['taxonomy']
+
+    with _taxonomy_lock:
+        entry = _taxonomies.get(path)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            if entry is None or entry['mtime'] != mtime:
+                entry = {'taxonomy': SkillTaxonomy.load(path), 'mtime': mtime}
+                _taxonomies[path] = entry
+        except (OSError, ValueError) as e:
+            if entry is None:
+                raise
+            # Keep serving the last good taxonomy while the file is mid-edit
+            # or briefly replaced; the next check retries the reload
+            print(f"Error reloading skill taxonomy {path}: {e}")
+        entry['checked'] = now
+        return entry['taxonomy']
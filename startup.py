@@ -0,0 +1,57 @@
+import importlib
+import os
+import sys
+import time
+
+# Imported first by app.py, so this approximates the start of app loading
+APP_IMPORT_STARTED = time.perf_counter()
+
+_lazy_import_times = {}
+_ready_at = None
+
+
+def lazy_import(name):
+    """Import a heavy module on first use, recording how long it took"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    _lazy_import_times[name] = round(time.perf_counter() - start, 4)
+    return module
+
+
+def process_age():
+    """Seconds since this process was exec'd, where /proc is available"""
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return round(uptime - start_ticks / os.sysconf('SC_CLK_TCK'), 3)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def mark_ready():
+    """Record the moment the app finished loading"""
+    global _ready_at
+    _ready_at = {
+        'app_import_seconds': round(time.perf_counter() - APP_IMPORT_STARTED, 4),
+        'process_age_seconds': process_age()
+    }
+
+
+def report():
+    """Cold-start numbers for the debug endpoint and CI"""
+    return {
+        'ready': _ready_at,
+        'lazy_imports': dict(_lazy_import_times),
+        'loaded_modules': len(sys.modules),
+        'heavy_modules_loaded': sorted(
+            name for name in ('pandas', 'numpy', 'PyPDF2', 'pypdfium2', 'pdfminer', 'docx',
+                              'spacy', 'openpyxl', 'pyarrow')
+            if name in sys.modules
+        ),
+        'process_age_seconds': process_age()
+    }
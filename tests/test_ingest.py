@@ -0,0 +1,82 @@
+import io
+import sqlite3
+import pytest
+import ingest
+import sandbox
+from job_matcher import JobMatcher
+from parse_cache import ParseCache
+from resume_parser import ResumeParser
+
+
+def close_idle_workers():
+    with sandbox._idle_lock:
+        workers = list(sandbox._idle)
+        sandbox._idle.clear()
+    for worker in workers:
+        worker.close()
+
+
+@pytest.fixture
+def worker_env(monkeypatch):
+    """Idle sandbox workers started with a 300 character budget"""
+    if not sandbox.available():
+        pytest.skip('sandbox workers need POSIX')
+    monkeypatch.setenv('PARSE_MAX_CHARS', '300')
+    close_idle_workers()
+    yield
+    close_idle_workers()
+
+
+def docx_bytes(*paragraphs):
+    document = pytest.importorskip('docx').Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def test_extraction_info_is_per_file_in_reused_worker(worker_env):
+    text, extraction = sandbox.run(ingest._extract_with_info, (b'python developer ' * 40,))
+    assert len(text) == 300
+    assert extraction == {'chars': 300, 'truncated': 'max_chars'}
+    worker = sandbox._idle[-1]
+
+    text, extraction = sandbox.run(ingest._extract_with_info, (docx_bytes('Jane Doe', 'Python, SQL'),))
+    assert sandbox._idle == [worker]
+    assert text == 'Jane Doe\nPython, SQL\n'
+    assert extraction == {'chars': len(text), 'truncated': None}
+
+
+@pytest.fixture
+def cached_ingest(tmp_path, monkeypatch):
+    """Inline ingest with a fresh parse cache and a 300 character budget"""
+    monkeypatch.setattr(ingest, '_parser', ResumeParser(ner_model='', max_chars=300))
+    monkeypatch.setattr(ingest, '_matcher', JobMatcher())
+    monkeypatch.setattr(ingest, '_cache', ParseCache(str(tmp_path / 'cache.db')))
+    return ingest._cache
+
+
+def test_cache_hit_keeps_extraction(cached_ingest):
+    items = [(b'Jane Doe\npython developer ' + b'sql ' * 200, 'jane.txt')]
+    (first, _), = ingest.process_batch(items, 'python and sql')
+    assert first['truncated'] == 'max_chars'
+
+    ingest._parser.last_extraction = {'backend': 'stale'}
+    (second, _), = ingest.process_batch(items, 'python and sql')
+    assert second == first
+    assert second['extraction'] == {'chars': 300, 'truncated': 'max_chars'}
+
+
+def test_cache_adds_extraction_to_old_tables(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    with sqlite3.connect(path) as conn:
+        conn.execute('CREATE TABLE parse_cache (hash TEXT PRIMARY KEY, version TEXT NOT NULL, '
+                     'text TEXT NOT NULL, data TEXT NOT NULL, last_used REAL NOT NULL)')
+        conn.execute("INSERT INTO parse_cache VALUES ('old', '1', 'text', '{}', 0)")
+    conn.close()
+
+    cache = ParseCache(path)
+    assert cache.get('old') == ('1', 'text', {}, None)
+    cache.put('new', '2', 'text', {}, {'chars': 4, 'truncated': None})
+    assert cache.get('new') == ('2', 'text', {}, {'chars': 4, 'truncated': None})
@@ -0,0 +1,151 @@
+import random
+import string
+import threading
+import pytest
+from job_matcher import JobMatcher, SkillIndex
+
+
+@pytest.fixture(scope='module')
+def matcher():
+    return JobMatcher()
+
+
+def loop_skill_matches(matcher, job_skill, resume_skills):
+    """The per-keyword scan SkillIndex replaced, kept as the reference"""
+    job_skill = job_skill.lower().strip()
+    for resume_skill in resume_skills:
+        resume_skill = resume_skill.lower().strip()
+        if job_skill == resume_skill:
+            return True
+        if job_skill in resume_skill or resume_skill in job_skill:
+            return True
+        if matcher.is_abbreviation(job_skill, resume_skill):
+            return True
+    return False
+
+
+RESUME_SKILLS = ['Python', 'JavaScript', 'SQL Server', 'machine learning', 'Node.js', 'react native',
+                 'C', 'Go', 'Django REST framework', 'ci/cd', '  AWS  ', 'x' * 100 + ' python']
+JOB_SKILLS = ['python', 'java', 'sql', 'sql server 2019', 'learning', 'node', 'react', 'c++', 'c#', 'go',
+              'rest', 'aws', 'azure', 'ci', 'PYTHON ', 'xx', 'golang', 'kubernetes', '']
+
+
+@pytest.mark.parametrize('job_skill', JOB_SKILLS)
+def test_index_matches_loop(matcher, job_skill):
+    index = SkillIndex(RESUME_SKILLS)
+    assert index.matches(job_skill) == loop_skill_matches(matcher, job_skill, RESUME_SKILLS)
+
+
+def test_index_matches_loop_randomized(matcher):
+    rng = random.Random(20240501)
+    alphabet = 'abcde .+#/'
+
+    def word(low, high):
+        return ''.join(rng.choice(alphabet) for _ in range(rng.randint(low, high)))
+
+    for _ in range(2000):
+        resume_skills = [word(1, 12) for _ in range(rng.randint(0, 8))]
+        index = SkillIndex(resume_skills)
+        for _ in range(5):
+            job_skill = word(1, 8)
+            assert index.matches(job_skill) == loop_skill_matches(matcher, job_skill, resume_skills), \
+                (job_skill, resume_skills)
+
+
+def test_long_skills_are_scanned(matcher):
+    long_skill = ''.join(random.Random(7).choice(string.ascii_lowercase) for _ in range(200))
+    index = SkillIndex([long_skill])
+    assert index.long == [long_skill]
+    assert index.matches(long_skill[50:80])
+    assert index.matches(f'senior {long_skill} engineer')
+    assert not index.matches('python')
+
+
+def test_skill_matches_accepts_lists_and_indexes(matcher):
+    assert matcher.skill_matches('python', ['Python Developer'])
+    assert matcher.skill_matches('python', SkillIndex(['Python Developer']))
+    assert not matcher.skill_matches('rust', ['Python Developer'])
+
+
+@pytest.mark.parametrize('job_skill, resume_skills', [
+    ('kubernetes', ['k8s']),
+    ('k8s', ['Kubernetes']),
+    ('go', ['golang']),
+    ('golang', ['Go']),
+    ('postgresql', ['postgres']),
+    ('javascript', ['JS']),
+    ('node.js', ['nodejs']),
+])
+def test_aliases_match_either_way(matcher, job_skill, resume_skills):
+    assert SkillIndex(resume_skills, matcher.taxonomy.aliases).matches(job_skill)
+
+
+def test_aliases_only_add_matches(matcher):
+    aliases = matcher.taxonomy.aliases
+    for job_skill in JOB_SKILLS:
+        if loop_skill_matches(matcher, job_skill, RESUME_SKILLS):
+            assert SkillIndex(RESUME_SKILLS, aliases).matches(job_skill)
+
+
+@pytest.mark.parametrize('resume_skills, job_description, score, matched', [
+    ('Go, AI, C#, Python', 'Need Go, AI and C#', 100.0, ['c#', 'go', 'ai']),
+    ('MongoDB, Django', 'Need Go', 0.0, []),
+    ('golang, k8s', 'Need Go and Kubernetes', 100.0, ['go', 'kubernetes']),
+    ('JavaScript', 'Need Java', 0.0, []),
+    ('SQL Server, Python developer', 'Need SQL and Python', 100.0, ['python', 'sql']),
+])
+def test_vocabulary_terms_match_exactly(matcher, resume_skills, job_description, score, matched):
+    result, found, _ = matcher.calculate_match(resume_skills, job_description)
+    assert result == score
+    assert sorted(found) == sorted(matched)
+
+
+def test_two_letter_skills_are_kept(matcher):
+    assert sorted(matcher.extract_resume_skills('go, ai, c#, r')) == ['ai', 'c#', 'go', 'r']
+
+
+def test_dotted_skills_stay_whole(matcher):
+    job_description = 'Experience with Node.js and ASP.NET required. Python 3.11 a plus.'
+    profile = matcher.profile(job_description)
+    assert {'node.js', 'asp.net'} <= set(profile.required)
+    assert profile.optional == ['python']
+    score, matched, _ = matcher.calculate_match('Node.js, ASP.NET', job_description)
+    assert {'node.js', 'asp.net'} <= set(matched)
+    assert score > 50
+
+
+@pytest.mark.parametrize('job_description, required, optional', [
+    ('Kubernetes is a must, Docker is a plus', ['kubernetes'], ['docker']),
+    ('Docker is a plus but Kubernetes is required', ['kubernetes'], ['docker']),
+    ('Python and Django. Nice to have: Kubernetes, Redis.', ['python', 'django'], ['kubernetes', 'redis']),
+    ('Experience with AWS, Docker and Kubernetes preferred', [], ['aws', 'docker', 'kubernetes']),
+    ('Preferred: Docker, must know Python', ['python'], ['docker']),
+    ('Python required; Redis optional', ['python'], ['redis']),
+])
+def test_optional_markers_cover_their_clauses(matcher, job_description, required, optional):
+    profile = matcher.profile(job_description)
+    assert profile.required == required
+    assert profile.optional == optional
+
+
+def test_profile_cache_is_thread_safe(monkeypatch):
+    monkeypatch.setattr('job_matcher.PROFILE_CACHE_SIZE', 4)
+    matcher = JobMatcher()
+    descriptions = [f'python and sql, {index} years' for index in range(12)]
+    errors = []
+
+    def hammer(seed):
+        rng = random.Random(seed)
+        try:
+            for _ in range(300):
+                matcher.profile(rng.choice(descriptions))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=hammer, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(matcher._profiles) <= 4
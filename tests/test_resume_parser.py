@@ -0,0 +1,38 @@
+import pytest
+from resume_parser import CONTACT_HEADER_CHARS, ResumeParser
+
+
+@pytest.fixture
+def parser():
+    return ResumeParser(ner_model='')
+
+
+def padded(field, end, tail=''):
+    """Text with field ending at character end, followed by tail"""
+    return 'x' * (end - len(field) - 1) + ' ' + field + tail
+
+
+@pytest.mark.parametrize('end', [CONTACT_HEADER_CHARS - 1, CONTACT_HEADER_CHARS,
+                                 CONTACT_HEADER_CHARS + 1, CONTACT_HEADER_CHARS + 20])
+def test_email_crossing_header_boundary(parser, end):
+    text = padded('jane.doe@example.com', end, ' and more text')
+    assert parser.extract_contact(text) == ('jane.doe@example.com', 'Not found')
+
+
+@pytest.mark.parametrize('end', [CONTACT_HEADER_CHARS - 1, CONTACT_HEADER_CHARS,
+                                 CONTACT_HEADER_CHARS + 2, CONTACT_HEADER_CHARS + 8])
+def test_phone_crossing_header_boundary(parser, end):
+    text = padded('+44 555 123 4567', end, ' call me')
+    assert parser.extract_contact(text) == ('Not found', '+445551234567')
+
+
+def test_contact_matches_separate_searches(parser):
+    text = 'Jane Doe\nphone (555) 123-4567\n' + 'x ' * 1200 + 'jane@example.org 555 765 4321'
+    assert parser.extract_contact(text) == (parser.extract_email(text), parser.extract_phone(text))
+    assert parser.extract_contact('short jane@example.org') == ('jane@example.org', 'Not found')
+
+
+def test_digit_run_cut_by_header_is_not_a_phone(parser):
+    # Ten digits fit in the header, but the full run is an account number
+    text = padded('555123456789', CONTACT_HEADER_CHARS + 2, ' ref')
+    assert parser.extract_contact(text) == ('Not found', 'Not found')
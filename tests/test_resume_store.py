@@ -0,0 +1,106 @@
+import multiprocessing
+import random
+from collections import Counter
+import pytest
+from minhash import signature
+from resume_store import ResumeStore
+
+PROCESSES = 8
+BATCHES = 40
+BATCH_SIZE = 20
+EMAILS = 300
+SKILLS = ['python', 'java', 'docker', 'kubernetes', 'aws', 'sql', 'react', 'go']
+
+
+def write_batches(db_path, seed):
+    store = ResumeStore(db_path)
+    rng = random.Random(seed)
+    for _ in range(BATCHES):
+        rows = []
+        for _ in range(BATCH_SIZE):
+            number = rng.randrange(EMAILS)
+            rows.append({
+                'Name': f'Candidate {number}',
+                'Email': f'candidate{number}@example.com',
+                'Phone Number': f'+1555000{number:04d}',
+                'ATS Score': round(rng.uniform(0, 100), 1),
+                'Skills': ', '.join(rng.sample(SKILLS, 3)),
+                'Missing Skills': rng.sample(SKILLS, rng.randint(0, 3)),
+            })
+        store.upsert_many(rows)
+
+
+def written_emails(seed):
+    rng = random.Random(seed)
+    emails = set()
+    for _ in range(BATCHES):
+        for _ in range(BATCH_SIZE):
+            emails.add(f'candidate{rng.randrange(EMAILS)}@example.com')
+            rng.uniform(0, 100)
+            rng.sample(SKILLS, 3)
+            rng.sample(SKILLS, rng.randint(0, 3))
+    return emails
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_concurrent_upserts_lose_nothing(tmp_path):
+    db_path = str(tmp_path / 'resumes.db')
+    store = ResumeStore(db_path)
+
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=write_batches, args=(db_path, seed)) for seed in range(PROCESSES)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(120)
+        assert worker.exitcode == 0
+
+    expected = set().union(*(written_emails(seed) for seed in range(PROCESSES)))
+    conn = store._connect()
+    rows = conn.execute('SELECT email, ats_score, missing_skills FROM resumes').fetchall()
+    assert sorted(row['email'] for row in rows) == sorted(expected)
+    assert store.count() == len(expected)
+
+    stats = store.stats(breakdown=True, top_missing=len(SKILLS))
+    scores = [row['ats_score'] for row in rows]
+    assert stats['total'] == len(rows)
+    assert stats['average'] == pytest.approx(sum(scores) / len(scores))
+    bands = Counter(min(int(score // 10), 9) for score in scores)
+    assert [band['count'] for band in stats['bands']] == [bands[band] for band in range(10)]
+    assert stats['high_scores'] == bands[8] + bands[9]
+
+    missing = Counter(skill for row in rows for skill in (row['missing_skills'] or '').split(', ') if skill)
+    stored = dict(conn.execute('SELECT skill, count FROM missing_skill_counts').fetchall())
+    assert stored == dict(missing)
+    assert {item['skill']: item['count'] for item in stats['top_missing_skills']} == dict(missing)
+
+
+RESUME_TEXT = ('Jane Doe. Backend engineer with eight years of Python, Django and PostgreSQL, '
+               'running Docker services on AWS and mentoring a team of four developers.')
+
+
+def resume_row(text, score, email='Not found'):
+    return {'Name': 'Jane Doe', 'Email': email, 'Phone Number': 'Not found', 'ATS Score': score,
+            'Skills': 'Python, Django', 'Text': text, 'Signature': signature(text)}
+
+
+@pytest.mark.parametrize('policy', ['link', 'merge'])
+def test_rescoring_same_content_updates_in_place(tmp_path, policy):
+    store = ResumeStore(str(tmp_path / 'resumes.db'), duplicate_policy=policy)
+    for score in (40, 70, 55):
+        store.upsert(resume_row(RESUME_TEXT, score))
+    records, _ = store.page()
+    assert store.count() == 1
+    assert [(record['ATS Score'], record['duplicate_of']) for record in records] == [('55%', None)]
+
+
+def test_near_duplicates_follow_policy(tmp_path):
+    edited = RESUME_TEXT.replace('four', 'five')
+    linked = ResumeStore(str(tmp_path / 'linked.db'), duplicate_policy='link', duplicate_threshold=0.5)
+    linked.upsert_many([resume_row(RESUME_TEXT, 40), resume_row(edited, 60)])
+    records, _ = linked.page()
+    assert [record['duplicate_of'] for record in records] == [None, records[0]['id']]
+
+    merged = ResumeStore(str(tmp_path / 'merged.db'), duplicate_policy='merge', duplicate_threshold=0.5)
+    merged.upsert_many([resume_row(RESUME_TEXT, 40), resume_row(edited, 60)])
+    assert merged.count() == 1
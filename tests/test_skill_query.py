@@ -0,0 +1,90 @@
+import importlib
+import sys
+import pytest
+from resume_store import ResumeStore
+from skill_query import SkillQuery
+
+CANDIDATES = {
+    'kube-go': 'Kubernetes, Go, Docker',
+    'kube-golang-php': 'Kubernetes, Go, PHP',
+    'kube-python': 'Kubernetes, Python',
+    'go-only': 'Go, SQL',
+}
+
+
+@pytest.mark.parametrize('query, tree', [
+    ('python', ('term', 'python')),
+    ('a AND b OR c', ('or', ('and', ('term', 'a'), ('term', 'b')), ('term', 'c'))),
+    ('a, b', ('and', ('term', 'a'), ('term', 'b'))),
+    ('machine learning NOT r', ('and', ('term', 'machine learning'), ('not', ('term', 'r')))),
+    ('a (b OR c)', ('and', ('term', 'a'), ('or', ('term', 'b'), ('term', 'c')))),
+    ('(a OR b) "c d"', ('and', ('or', ('term', 'a'), ('term', 'b')), ('term', 'c d'))),
+    ('kubernetes AND (go OR golang) NOT php',
+     ('and', ('and', ('term', 'kubernetes'), ('or', ('term', 'go'), ('term', 'golang'))),
+      ('not', ('term', 'php')))),
+    ('NOT NOT a', ('not', ('not', ('term', 'a')))),
+])
+def test_parse(query, tree):
+    assert SkillQuery(query).tree == tree
+
+
+@pytest.mark.parametrize('query, error', [
+    ('', 'Empty skill query'),
+    ('a AND', 'Incomplete skill query'),
+    ('(a OR b', 'Missing ) in skill query'),
+    ('a OR b)', "Unexpected ')' in skill query"),
+    ('OR a', "Unexpected 'OR' in skill query"),
+])
+def test_parse_errors(query, error):
+    with pytest.raises(ValueError, match=error.replace('(', r'\(').replace(')', r'\)')):
+        SkillQuery(query)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResumeStore(str(tmp_path / 'resumes.db'))
+    store.upsert_many([{
+        'Name': name,
+        'Email': f'{name}@example.com',
+        'Phone Number': 'Not found',
+        'ATS Score': 50.0,
+        'Skills': skills,
+        'Missing Skills': [],
+    } for name, skills in CANDIDATES.items()])
+    return store
+
+
+def names(records):
+    return sorted(record['Name'] for record in records)
+
+
+@pytest.mark.parametrize('query, found', [
+    ('kubernetes', ['kube-go', 'kube-golang-php', 'kube-python']),
+    ('kubernetes AND (go OR golang) NOT php', ['kube-go']),
+    ('kubernetes NOT go', ['kube-python']),
+    ('go OR python NOT kubernetes', ['go-only', 'kube-go', 'kube-golang-php']),
+    ('NOT kubernetes', ['go-only']),
+])
+def test_store_search(store, query, found):
+    assert names(store.search(skills=query)) == found
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, store):
+    monkeypatch.chdir(tmp_path)
+    server = sys.modules.get('app') or importlib.import_module('app')
+    monkeypatch.setattr(server, 'store', store)
+    client = server.app.test_client()
+    with client.session_transaction() as session:
+        session['authenticated'] = True
+    return client
+
+
+def test_search_endpoint(client):
+    response = client.get('/search', query_string={'skills': 'kubernetes AND (go OR golang) NOT php'})
+    assert response.status_code == 200
+    assert names(response.get_json()['resumes']) == ['kube-go']
+
+    response = client.get('/search', query_string={'skills': 'kubernetes AND'})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Incomplete skill query'
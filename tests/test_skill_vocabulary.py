@@ -0,0 +1,61 @@
+import random
+import re
+import pytest
+from skill_vocabulary import DEFAULT_TAXONOMY, SkillVocabulary, get_taxonomy
+
+TERMS = ['Python', 'Java', 'JavaScript', 'C', 'C++', 'C#', 'Go', 'SQL', 'SQL Server', 'Node.js', 'CI/CD',
+         'API', 'Unit Test', 'Machine Learning', 'AI', 'R']
+ALIASES = {'js': 'JavaScript', 'golang': 'Go', 'ml': 'Machine Learning'}
+
+
+def flat_pattern(vocabulary):
+    """The flat longest-first alternation the trie pattern replaced"""
+    def alternative(key):
+        return re.escape(key) + ('s?' if len(key) >= 3 and key[-1].isalpha() else '')
+
+    alternatives = sorted(vocabulary._surface, key=len, reverse=True)
+    return re.compile(rf"(?<![a-z0-9])(?:{'|'.join(map(alternative, alternatives))})(?![a-z0-9])", re.I)
+
+
+@pytest.mark.parametrize('text, found', [
+    ('Python, Go and SQL Server', ['Python', 'Go', 'SQL', 'SQL Server']),
+    ('good java maintainer', ['Java']),
+    ('JavaScript (js) and golang', ['JavaScript', 'Go']),
+    ('C, C++ and C# on CI/CD', ['C', 'C++', 'C#', 'CI/CD']),
+    ('REST APIs with unit tests', ['API', 'Unit Test']),
+    ('Node.js; ML; R', ['JavaScript', 'Node.js', 'Machine Learning', 'R']),
+    ('sqlite3, golangci, cis', []),
+])
+def test_find(text, found):
+    assert SkillVocabulary(TERMS, ALIASES).find(text) == found
+
+
+def test_trie_matches_flat_alternation():
+    taxonomy = get_taxonomy()
+    vocabulary = taxonomy.vocabulary
+    reference = flat_pattern(vocabulary)
+    rng = random.Random(5)
+    words = [skill.lower() for skill in taxonomy.skills] + list(taxonomy.aliases) + \
+        ['good', 'maintain', 'sqlite3', 'c', '++', '#', 's', 'unit', 'tests', 'node', '-']
+    for _ in range(500):
+        text = ' '.join(rng.choice(words) + rng.choice(['', ' ', ',', '.', 's', '/'])
+                        for _ in range(rng.randint(1, 12)))
+        assert [m.group(0) for m in vocabulary._pattern.finditer(text)] == \
+            [m.group(0) for m in reference.finditer(text)], text
+
+
+def test_large_vocabulary():
+    terms = [f'skill{index}x' for index in range(5000)] + TERMS
+    vocabulary = SkillVocabulary(terms, ALIASES)
+    assert vocabulary.find('skill4999x, skill12x and Go, not skill12') == ['skill12x', 'skill4999x', 'Go']
+
+
+def test_taxonomy_survives_missing_file(tmp_path, monkeypatch):
+    monkeypatch.setattr('skill_vocabulary.TAXONOMY_CHECK_INTERVAL', 0)
+    path = tmp_path / 'skills.json'
+    path.write_text(open(DEFAULT_TAXONOMY).read())
+    taxonomy = get_taxonomy(str(path))
+    path.unlink()
+    assert get_taxonomy(str(path)) is taxonomy
+    with pytest.raises(FileNotFoundError):
+        get_taxonomy(str(tmp_path / 'missing.json'))